@@ -0,0 +1,203 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from bayesian_models import BayesianABTest, GammaPoissonABTest, SequentialBayesianTest
+from sufficient_stats import (
+    BinomialStats,
+    CountStats,
+    merge_stats_maps,
+    stats_map_from_bytes,
+    stats_map_to_bytes,
+)
+
+
+def _is_parquet(path):
+    return str(path).endswith(('.parquet', '.pq'))
+
+
+def _read_task(task, columns):
+    path, row_groups = task
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        if row_groups is None:
+            table = parquet_file.read(columns=columns)
+        else:
+            table = parquet_file.read_row_groups(row_groups, columns=columns)
+        return table.to_pandas()
+
+    import pandas as pd
+
+    return pd.read_csv(path, usecols=columns)
+
+
+def aggregate_frame(df, group_col='group', outcome_col='converted', segment_cols=(), kind='binomial'):
+    keys = [group_col] + list(segment_cols)
+    grouped = df.groupby(keys, sort=False, observed=True)[outcome_col]
+    sums = grouped.sum()
+    counts = grouped.count()
+
+    stats_map = {}
+    for key, total, n in zip(sums.index, sums.to_numpy(), counts.to_numpy()):
+        key = tuple(str(part) for part in key) if isinstance(key, tuple) else str(key)
+        if kind == 'binomial':
+            stats_map[key] = BinomialStats(total, n)
+        else:
+            stats_map[key] = CountStats(total, n)
+    return stats_map
+
+
+def _aggregate_task(task, group_col, outcome_col, segment_cols, kind):
+    columns = [group_col, outcome_col] + list(segment_cols)
+    df = _read_task(task, columns)
+    # Workers ship back compact bytes instead of pickled frames or objects
+    return stats_map_to_bytes(aggregate_frame(df, group_col, outcome_col, segment_cols, kind))
+
+
+def plan_tasks(paths, row_groups_per_task=None):
+    tasks = []
+    for path in paths:
+        if row_groups_per_task and _is_parquet(path):
+            import pyarrow.parquet as pq
+
+            n_row_groups = pq.ParquetFile(path).num_row_groups
+            for start in range(0, n_row_groups, row_groups_per_task):
+                stop = min(start + row_groups_per_task, n_row_groups)
+                tasks.append((path, list(range(start, stop))))
+        else:
+            tasks.append((path, None))
+    return tasks
+
+
+def aggregate_files(paths, group_col='group', outcome_col='converted', segment_cols=(),
+                    kind='binomial', n_workers=None, row_groups_per_task=None, combine=True):
+    if kind not in ('binomial', 'count'):
+        raise ValueError("kind must be 'binomial' or 'count'")
+
+    tasks = plan_tasks(paths, row_groups_per_task)
+    worker = partial(_aggregate_task, group_col=group_col, outcome_col=outcome_col,
+                     segment_cols=tuple(segment_cols), kind=kind)
+
+    n_workers = n_workers or os.cpu_count() or 1
+    if n_workers == 1 or len(tasks) <= 1:
+        payloads = [worker(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_workers, len(tasks))) as executor:
+            # Results come back in task order, which build_sequential_test relies on
+            chunksize = max(1, len(tasks) // (4 * n_workers))
+            payloads = list(executor.map(worker, tasks, chunksize=chunksize))
+
+    stats_maps = [stats_map_from_bytes(payload) for payload in payloads]
+    if not combine:
+        return stats_maps
+    return merge_stats_maps(*stats_maps)
+
+
+def collapse_segments(stats_map):
+    # (variant, segment...) -> variant totals
+    totals = {}
+    for key, value in stats_map.items():
+        variant = key[0] if isinstance(key, tuple) else key
+        totals[variant] = totals[variant].merge(value) if variant in totals else value
+    return totals
+
+
+def select_segment(stats_map, segment):
+    segment = tuple(str(part) for part in np.atleast_1d(segment))
+    return {key[0]: value for key, value in stats_map.items()
+            if isinstance(key, tuple) and key[1:] == segment}
+
+
+def stats_map_from_table(df, segment_cols=(), group_col='group', successes_col='successes',
+                         trials_col='trials', kind='binomial'):
+    # Pre-aggregated counts (one row per variant and segment) -> stats map;
+    # for count metrics successes/trials are events/exposure
+    stats_type = BinomialStats if kind == 'binomial' else CountStats
+    keys = zip(*(df[col].astype(str).to_numpy() for col in [group_col] + list(segment_cols)))
+    stats_map = {}
+    for key, successes, trials in zip(keys, df[successes_col].to_numpy(), df[trials_col].to_numpy()):
+        key = key if segment_cols else key[0]
+        value = stats_type(successes, trials)
+        stats_map[key] = stats_map[key].merge(value) if key in stats_map else value
+    return stats_map
+
+
+def segment_arrays(stats_map):
+    # Aligns A and B counts per segment; segments missing a variant are skipped
+    variants = {}
+    for key, value in stats_map.items():
+        if not isinstance(key, tuple) or len(key) < 2:
+            continue
+        variants.setdefault(key[1:], {})[key[0]] = value
+
+    segments = [segment for segment, groups in variants.items() if 'A' in groups and 'B' in groups]
+    kinds = {type(variants[segment][group]) for segment in segments for group in ('A', 'B')}
+    if len(kinds) > 1:
+        raise ValueError("Cannot mix binomial and count statistics across segments")
+
+    columns = {}
+    for group in ('A', 'B'):
+        stats = [variants[segment][group] for segment in segments]
+        if kinds == {CountStats}:
+            columns[f'successes_{group}'] = np.array([s.events for s in stats], dtype=float)
+            columns[f'trials_{group}'] = np.array([s.exposure for s in stats], dtype=float)
+        else:
+            columns[f'successes_{group}'] = np.array([s.successes for s in stats], dtype=float)
+            columns[f'trials_{group}'] = np.array([s.trials for s in stats], dtype=float)
+    kind = 'count' if kinds == {CountStats} else 'binomial'
+    return segments, columns, kind
+
+
+def analyze_segments(stats_map, alpha_prior=1, beta_prior=1, sort_by='max_expected_loss'):
+    # Scores every (segment...) slice of a stats map in one batch_calculate_risk
+    # call. Segments are sorted by sort_by, largest first; the default puts the
+    # slices where a wrong call would cost the most at the top.
+    segments, columns, kind = segment_arrays(stats_map)
+    model = GammaPoissonABTest if kind == 'count' else BayesianABTest
+    risk = model.batch_calculate_risk(
+        columns['successes_A'], columns['trials_A'], columns['successes_B'], columns['trials_B'],
+        alpha_prior, beta_prior
+    )
+
+    result = dict(columns, **risk)
+    result['max_expected_loss'] = np.maximum(risk['expected_loss_choose_A'], risk['expected_loss_choose_B'])
+    order = np.arange(len(segments))
+    if sort_by is not None and len(segments):
+        order = np.argsort(-np.asarray(result[sort_by], dtype=float), kind='stable')
+    result = {key: np.asarray(value)[order] for key, value in result.items()}
+    result['segments'] = [segments[i] for i in order]
+    result['kind'] = kind
+    return result
+
+
+def build_bayesian_test(stats_map, alpha_prior=1, beta_prior=1, segment=None):
+    variants = collapse_segments(stats_map) if segment is None else select_segment(stats_map, segment)
+    if 'A' not in variants or 'B' not in variants:
+        raise ValueError("Both groups A and B must be present in the aggregated counts")
+
+    if isinstance(variants['A'], CountStats):
+        test = GammaPoissonABTest(alpha_prior=alpha_prior, beta_prior=beta_prior)
+    else:
+        test = BayesianABTest(alpha_prior=alpha_prior, beta_prior=beta_prior)
+    variants['A'].update_test(test, 'A')
+    variants['B'].update_test(test, 'B')
+    return test
+
+
+def build_sequential_test(batch_maps, alpha_prior=1, beta_prior=1, segment=None):
+    # batch_maps is the per-task output of aggregate_files(..., combine=False),
+    # e.g. one entry per daily log file, in arrival order.
+    seq_test = SequentialBayesianTest(alpha_prior=alpha_prior, beta_prior=beta_prior)
+    for stats_map in batch_maps:
+        variants = collapse_segments(stats_map) if segment is None else select_segment(stats_map, segment)
+        for group in ['A', 'B']:
+            if group not in variants:
+                continue
+            if not isinstance(variants[group], BinomialStats):
+                raise ValueError("Sequential tests require binomial counts")
+            variants[group].add_to_sequential(seq_test, group)
+    return seq_test
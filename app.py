@@ -4,23 +4,39 @@ import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import base64
+import os
 import warnings
 warnings.filterwarnings('ignore')
 
 # Import our modules (same as before)
-from bayesian_models import BayesianABTest, FrequentistABTest, SequentialBayesianTest
+import instrumentation
+from experiment_store import ExperimentStore
+from jobs import JobManager
+from live_tail import EventLogTailer
+from group_sequential import SPENDING_FUNCTIONS, compute_boundaries
+from sketches import summary_probability_greater
+from bayesian_models import BayesianABTest, FrequentistABTest, MixtureSPRT
 from visualizations import (
     plot_posterior_distributions, 
     plot_uplift_distribution,
-    plot_sequential_history
+    plot_sequential_history,
+    plot_prior_sensitivity,
+    SENSITIVITY_METRICS
 )
 from utils import (
     generate_simulated_data,
     format_results_for_display,
     calculate_required_sample_size,
-    calculate_bayes_factor
+    calculate_bayes_factor,
+    simulate_scenario,
+    simulate_stopping_rule,
+    replay_sequential,
+    prior_grid
 )
 
+# Long sequential replays are thinned to this many points per chart
+MAX_PLOT_POINTS = 1000
+
 st.set_page_config(
     page_title="Bayesian A/B Testing",
     page_icon="📊",
@@ -555,6 +571,108 @@ if 'results' not in st.session_state:
     st.session_state.results = None
 if 'current_page' not in st.session_state:
     st.session_state.current_page = 'analyze'
+if 'experiment_name' not in st.session_state:
+    st.session_state.experiment_name = 'default'
+if 'tailer' not in st.session_state:
+    st.session_state.tailer = None
+if 'jobs' not in st.session_state:
+    # slot -> (inputs the job was submitted with, Job)
+    st.session_state.jobs = {}
+
+@st.cache_resource
+def get_experiment_store():
+    # Shared by all sessions; survives reruns, restarts reload from disk
+    return ExperimentStore(os.environ.get('AB_EXPERIMENT_DB', 'experiments.db'))
+
+@st.cache_resource
+def get_job_manager():
+    # Shared worker pool for long simulations; each session tracks its own jobs
+    return JobManager(max_workers=2)
+
+def current_job(slot, params):
+    # The session's job in this slot, if it was submitted with these inputs.
+    # A job whose inputs have changed since is cancelled and dropped.
+    entry = st.session_state.jobs.get(slot)
+    if entry is None:
+        return None
+    job_params, job = entry
+    if job_params != params:
+        job.cancel()
+        del st.session_state.jobs[slot]
+        return None
+    return job
+
+def submit_job(slot, params, fn, *args, **kwargs):
+    previous = st.session_state.jobs.get(slot)
+    if previous is not None:
+        previous[1].cancel()
+    job = get_job_manager().submit(fn, *args, **kwargs)
+    st.session_state.jobs[slot] = (params, job)
+    return job
+
+@st.fragment(run_every=0.5)
+def show_job_progress(slot, label, describe=None):
+    # Only this fragment reruns while the job is working; the full rerun at
+    # the end renders its result
+    entry = st.session_state.jobs.get(slot)
+    if entry is None or entry[1].done():
+        st.rerun()
+    job = entry[1]
+    text = f"{label} · {job.progress:.0%}"
+    if describe is not None and job.partial is not None:
+        text += f" · {describe(job.partial)}"
+    st.progress(job.progress, text=text)
+    if st.button("Cancel", key=f"cancel_{slot}"):
+        job.cancel()
+        del st.session_state.jobs[slot]
+        st.rerun()
+
+def job_result(slot, job, label, describe=None):
+    # Progress while the job runs, its result once it is done
+    if job is None:
+        return None
+    if not job.done():
+        show_job_progress(slot, label, describe)
+        return None
+    if job.error() is not None:
+        st.error(f"{label} failed: {job.error()}")
+        return None
+    return None if job.status == 'cancelled' else job.result()
+
+def replay_and_save(store, name, data, n_batches, progress, **kwargs):
+    seq_test = replay_sequential(data, n_batches, rng=42, progress=lambda fraction: progress(fraction / 2),
+                                 **kwargs)
+    progress(0.5)
+    store.save_sequential_test(name, seq_test)
+    return seq_test
+
+def simulate_stopping_rules(rate_a, rate_b, progress, **rule_kwargs):
+    # The rule at the observed rates, then an A/A run at the baseline rate
+    observed = simulate_stopping_rule(rate_a, rate_b, **rule_kwargs)
+    progress(0.5, {'observed': observed})
+    return observed, simulate_stopping_rule(rate_a, rate_a, **rule_kwargs)
+
+def sequential_experiment_name(name):
+    return f"{name}:sequential"
+
+def restore_saved_experiment():
+    # New tabs and restarted apps pick up the last saved state of the experiment
+    store = get_experiment_store()
+    name = st.session_state.experiment_name
+    if st.session_state.bayes_test is None and store.has_experiment(name):
+        bayes_test = store.load_bayesian_test(name)
+        if 'A' in bayes_test.results and 'B' in bayes_test.results:
+            st.session_state.bayes_test = bayes_test
+            st.session_state.data = {
+                group: {'successes': bayes_test.results[group]['successes'],
+                        'trials': bayes_test.results[group]['trials']}
+                for group in ['A', 'B']
+            }
+            st.session_state.results = store.load_results(name)
+    if st.session_state.sequential_test is None and store.has_experiment(sequential_experiment_name(name)):
+        st.session_state.sequential_test = store.load_sequential_test(sequential_experiment_name(name))
+
+restore_saved_experiment()
 
 def main():
     st.markdown('<div class="main-container">', unsafe_allow_html=True)
@@ -611,6 +729,8 @@ def main():
     elif st.session_state.current_page == 'learn':
         show_learn_page()
     
+    show_diagnostics_panel()
+    
     # Footer
     st.markdown("""
     <div class="footer">
@@ -622,6 +742,33 @@ def main():
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+def show_diagnostics_panel():
+    with st.expander("Diagnostics", expanded=False):
+        enabled = st.checkbox("Record timings and counters", value=instrumentation.is_enabled(),
+                              key="diagnostics_enabled")
+        if enabled != instrumentation.is_enabled():
+            instrumentation.enable() if enabled else instrumentation.disable()
+        
+        if st.button("Reset diagnostics"):
+            instrumentation.reset()
+        
+        diagnostics = instrumentation.snapshot()
+        if diagnostics['timers']:
+            timers_df = pd.DataFrame([
+                {'Stage': name, 'Calls': stats['calls'], 'Total (ms)': round(stats['total_ms'], 2),
+                 'Mean (ms)': round(stats['mean_ms'], 2), 'Max (ms)': round(stats['max_ms'], 2)}
+                for name, stats in sorted(diagnostics['timers'].items(),
+                                          key=lambda item: -item[1]['total_ms'])
+            ])
+            st.dataframe(timers_df, use_container_width=True, hide_index=True)
+        if diagnostics['counters']:
+            counters_df = pd.DataFrame([
+                {'Counter': name, 'Value': value} for name, value in sorted(diagnostics['counters'].items())
+            ])
+            st.dataframe(counters_df, use_container_width=True, hide_index=True)
+        if not diagnostics['timers'] and not diagnostics['counters']:
+            st.caption("Enable recording, then rerun an analysis to see per-stage timings.")
+
 def show_analyze_page():
     st.markdown('<div class="section-title">Analysis</div>', unsafe_allow_html=True)
     
@@ -684,6 +831,15 @@ def show_analyze_page():
         </div>
         """, unsafe_allow_html=True)
     
+    experiment_name = st.text_input("Experiment name", value=st.session_state.experiment_name,
+                                    help="Results are saved under this name and restored on restart")
+    if experiment_name != st.session_state.experiment_name:
+        st.session_state.experiment_name = experiment_name
+        st.session_state.bayes_test = None
+        st.session_state.sequential_test = None
+        st.session_state.results = None
+        restore_saved_experiment()
+    
     # Run analysis button
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
@@ -710,6 +866,8 @@ def show_analyze_page():
             # Calculate results
             risk_metrics = bayes_test.calculate_risk()
             bayes_factor = calculate_bayes_factor(bayes_test)
+            # Compact histogram/quantile summary; no per-sample arrays in session state
+            uplift_stats = bayes_test.uplift_distribution(summary_only=True)
             
             # Store in session state
             st.session_state.data = {
@@ -719,8 +877,12 @@ def show_analyze_page():
             st.session_state.bayes_test = bayes_test
             st.session_state.results = {
                 'risk_metrics': risk_metrics,
-                'bayes_factor': bayes_factor
+                'bayes_factor': bayes_factor,
+                'uplift': uplift_stats
             }
+            store = get_experiment_store()
+            store.save_bayesian_test(st.session_state.experiment_name, bayes_test)
+            store.save_results(st.session_state.experiment_name, st.session_state.results)
             
             st.markdown(render_status_badge(f"✓ Analysis complete · Group B beats A with {risk_metrics['probability_B_beats_A']:.1%} probability", "success"), 
                        unsafe_allow_html=True)
@@ -757,12 +919,14 @@ def show_analyze_page():
         # Posterior distributions
         st.markdown('<div class="subsection-title">Posterior Distributions</div>', unsafe_allow_html=True)
         fig_posterior = plot_posterior_distributions(bayes_test)
-        st.plotly_chart(fig_posterior, use_container_width=True)
+        with instrumentation.timer('app.render.posterior_distributions'):
+            st.plotly_chart(fig_posterior, use_container_width=True)
         
         # Uplift analysis
         st.markdown('<div class="subsection-title">Uplift Analysis</div>', unsafe_allow_html=True)
-        fig_uplift = plot_uplift_distribution(bayes_test)
-        st.plotly_chart(fig_uplift, use_container_width=True)
+        fig_uplift = plot_uplift_distribution(bayes_test, uplift_stats=st.session_state.results.get('uplift'))
+        with instrumentation.timer('app.render.uplift_distribution'):
+            st.plotly_chart(fig_uplift, use_container_width=True)
         
         # Decision metrics
         col1, col2 = st.columns(2)
@@ -839,9 +1003,10 @@ def show_analyze_page():
             
             # Probability of meaningful effect
             min_uplift = st.slider("Minimum meaningful uplift", 0.0, 20.0, 5.0, 1.0, key="min_uplift_analyze", format="%.0f%%")
-            samples_a = bayes_test.get_posterior_samples('A')
-            samples_b = bayes_test.get_posterior_samples('B')
-            prob_meaningful = np.mean((samples_b - samples_a) / samples_a * 100 > min_uplift)
+            uplift_stats = st.session_state.results.get('uplift')
+            if uplift_stats is None:
+                uplift_stats = bayes_test.uplift_distribution(summary_only=True)
+            prob_meaningful = summary_probability_greater(uplift_stats['relative_histogram'], min_uplift)
             
             st.markdown(f"""
             <div style="margin-top: 1rem; padding: 1rem; background: #fafafa; border: 1px solid #e5e5e5; border-radius: 6px;">
@@ -851,6 +1016,34 @@ def show_analyze_page():
                 </div>
             </div>
             """, unsafe_allow_html=True)
+        
+        # Prior sensitivity
+        st.markdown('<div class="subsection-title">Prior Sensitivity</div>', unsafe_allow_html=True)
+        
+        sensitivity_metric = st.selectbox("Metric", options=list(SENSITIVITY_METRICS),
+                                          format_func=lambda metric: SENSITIVITY_METRICS[metric][0],
+                                          key="sensitivity_metric")
+        # Prior means from half to twice the pooled rate, strengths from a
+        # couple of pseudo-observations to several times the data
+        total_successes = bayes_test.results['A']['successes'] + bayes_test.results['B']['successes']
+        total_trials = bayes_test.results['A']['trials'] + bayes_test.results['B']['trials']
+        prior_means = np.clip(total_successes / total_trials * np.geomspace(0.5, 2, 21), 0.001, 0.999)
+        prior_strengths = np.geomspace(2, 4 * total_trials, 25)
+        sensitivity = bayes_test.prior_sensitivity(*prior_grid(prior_means, prior_strengths))
+        
+        fig_sensitivity = plot_prior_sensitivity(sensitivity, sensitivity_metric,
+                                                 current_prior=(bayes_test.alpha_prior, bayes_test.beta_prior))
+        with instrumentation.timer('app.render.prior_sensitivity'):
+            st.plotly_chart(fig_sensitivity, use_container_width=True)
+        
+        agreement = np.mean(sensitivity['recommended_choice'] == risk_metrics['recommended_choice'])
+        st.markdown(f"""
+        <div class="insight-box">
+            <div class="insight-title">Robustness to the prior</div>
+            Group {risk_metrics['recommended_choice']} is recommended under {agreement:.0%} of the
+            {sensitivity['recommended_choice'].size} priors on the grid
+        </div>
+        """, unsafe_allow_html=True)
 
 def show_sequential_page():
     st.markdown('<div class="section-title">Sequential Analysis</div>', unsafe_allow_html=True)
@@ -869,74 +1062,45 @@ def show_sequential_page():
     col1, col2 = st.columns(2)
     
     with col1:
-        n_batches = st.slider("Number of batches", 5, 50, 20, 5)
+        n_batches = st.number_input("Number of batches", min_value=5, max_value=100000, value=20, step=5)
     
     with col2:
         update_speed = st.select_slider("Update speed", options=["Slow", "Medium", "Fast"], value="Medium")
     
-    # Run sequential simulation
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        half_life = st.number_input("Forgetting half-life (batches, 0 = off)", min_value=0, max_value=1000, value=0,
+                                    help="Down-weights older batches so the posterior tracks drifting traffic")
+    with col2:
+        window = st.number_input("Monitoring window (batches, 0 = off)", min_value=0, max_value=1000, value=0,
+                                 help="Also track a posterior over the most recent batches only")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        planned_looks = st.number_input("Planned interim looks (0 = no boundaries)", min_value=0, max_value=50,
+                                        value=5, help="Overlay group-sequential stopping boundaries")
+    with col2:
+        spending = st.selectbox("Spending function", options=list(SPENDING_FUNCTIONS),
+                                format_func=lambda kind: kind.replace('_', '-').title())
+    
+    # Run sequential simulation in the background
+    replay_params = (st.session_state.experiment_name, n_batches, half_life, window,
+                     tuple((group['successes'], group['trials']) for group in st.session_state.data.values()))
+    replay_job = current_job('replay', replay_params)
     if st.button("Run Sequential Simulation", use_container_width=True):
-        with st.spinner("Simulating sequential updates..."):
-            # Get data from session state
-            data_a = st.session_state.data['A']
-            data_b = st.session_state.data['B']
-            
-            # Initialize sequential test
-            seq_test = SequentialBayesianTest(alpha_prior=1.0, beta_prior=1.0)
-            
-            # Simulate sequential observations
-            np.random.seed(42)
-            
-            # Create batch data
-            successes_a_remaining = data_a['successes']
-            successes_b_remaining = data_b['successes']
-            trials_a_remaining = data_a['trials']
-            trials_b_remaining = data_b['trials']
-            
-            batch_size_a = trials_a_remaining // n_batches
-            batch_size_b = trials_b_remaining // n_batches
-            
-            progress_bar = st.progress(0)
-            
-            for i in range(n_batches):
-                # Group A batch
-                batch_trials_a = min(batch_size_a, trials_a_remaining)
-                if batch_trials_a > 0:
-                    if successes_a_remaining > 0:
-                        batch_successes_a = np.random.hypergeometric(
-                            successes_a_remaining, 
-                            trials_a_remaining - successes_a_remaining,
-                            batch_trials_a
-                        )
-                    else:
-                        batch_successes_a = 0
-                    
-                    seq_test.add_observation('A', batch_successes_a, batch_trials_a)
-                    successes_a_remaining -= batch_successes_a
-                    trials_a_remaining -= batch_trials_a
-                
-                # Group B batch
-                batch_trials_b = min(batch_size_b, trials_b_remaining)
-                if batch_trials_b > 0:
-                    if successes_b_remaining > 0:
-                        batch_successes_b = np.random.hypergeometric(
-                            successes_b_remaining,
-                            trials_b_remaining - successes_b_remaining,
-                            batch_trials_b
-                        )
-                    else:
-                        batch_successes_b = 0
-                    
-                    seq_test.add_observation('B', batch_successes_b, batch_trials_b)
-                    successes_b_remaining -= batch_successes_b
-                    trials_b_remaining -= batch_trials_b
-                
-                progress_bar.progress((i + 1) / n_batches)
-            
-            progress_bar.empty()
-            st.session_state.sequential_test = seq_test
-            
-            st.markdown(render_status_badge("✓ Sequential simulation complete", "success"), unsafe_allow_html=True)
+        replay_job = submit_job(
+            'replay', replay_params, replay_and_save, get_experiment_store(),
+            sequential_experiment_name(st.session_state.experiment_name), st.session_state.data, n_batches,
+            half_life=half_life or None, window=window or None
+        )
+    
+    seq_result = job_result('replay', replay_job, "Simulating sequential updates")
+    if seq_result is not None:
+        st.session_state.sequential_test = seq_result
+        del st.session_state.jobs['replay']
+        st.markdown(render_status_badge("✓ Sequential simulation complete", "success"), unsafe_allow_html=True)
     
     # Display sequential results
     if st.session_state.sequential_test is not None:
@@ -944,35 +1108,15 @@ def show_sequential_page():
         
         # Posterior evolution
         st.markdown('<div class="subsection-title">Posterior Mean Evolution</div>', unsafe_allow_html=True)
-        fig_seq = plot_sequential_history(seq_test)
-        st.plotly_chart(fig_seq, use_container_width=True)
+        fig_seq = plot_sequential_history(seq_test, max_points=MAX_PLOT_POINTS)
+        with instrumentation.timer('app.render.sequential_history'):
+            st.plotly_chart(fig_seq, use_container_width=True)
         
         # Probability evolution
         st.markdown('<div class="subsection-title">Probability B > A Over Time</div>', unsafe_allow_html=True)
         
         # Calculate probability at each step
-        df_history = seq_test.get_history_df()
-        prob_history = []
-        
-        steps = range(1, min(len(df_history[df_history['group'] == 'A']), 
-                            len(df_history[df_history['group'] == 'B'])) + 1)
-        
-        temp_test = SequentialBayesianTest(alpha_prior=1.0, beta_prior=1.0)
-        
-        for step in steps:
-            a_obs = df_history[(df_history['group'] == 'A') & (df_history['step'] <= step)]
-            b_obs = df_history[(df_history['group'] == 'B') & (df_history['step'] <= step)]
-            
-            if not a_obs.empty and not b_obs.empty:
-                cum_a = a_obs.iloc[-1]
-                cum_b = b_obs.iloc[-1]
-                
-                temp_test = SequentialBayesianTest(alpha_prior=1.0, beta_prior=1.0)
-                temp_test.add_observation('A', cum_a['cumulative_successes'], cum_a['cumulative_trials'])
-                temp_test.add_observation('B', cum_b['cumulative_successes'], cum_b['cumulative_trials'])
-                
-                prob = temp_test.get_current_probability()
-                prob_history.append({'step': step, 'probability': prob})
+        prob_history = seq_test.get_probability_history(n_samples=None, max_points=MAX_PLOT_POINTS)
         
         if prob_history:
             prob_df = pd.DataFrame(prob_history)
@@ -1006,6 +1150,28 @@ def show_sequential_page():
                 annotation_position="bottom left"
             )
             
+            if planned_looks:
+                # Looks spread evenly over the batches; with a flat prior
+                # P(B > A) is close to Phi(z), so z boundaries map onto this axis
+                boundaries = compute_boundaries(planned_looks, spending=spending)
+                look_steps = np.ceil(boundaries['information'] * prob_df['step'].max())
+                fig_prob.add_trace(go.Scatter(
+                    x=look_steps,
+                    y=boundaries['efficacy_probability'],
+                    mode='lines+markers',
+                    line=dict(color='#2e7d32', width=1, dash='dash'),
+                    marker=dict(symbol='triangle-up', size=8),
+                    name='Efficacy boundary'
+                ))
+                fig_prob.add_trace(go.Scatter(
+                    x=look_steps,
+                    y=boundaries['futility_probability'],
+                    mode='lines+markers',
+                    line=dict(color='#c62828', width=1, dash='dash'),
+                    marker=dict(symbol='triangle-down', size=8),
+                    name='Futility boundary'
+                ))
+            
             fig_prob.update_layout(
                 height=350,
                 margin=dict(l=20, r=20, t=30, b=20),
@@ -1014,8 +1180,7 @@ def show_sequential_page():
                 font=dict(family='Inter', size=11),
                 xaxis=dict(
                     title="Batch Number",
-                    gridcolor='#f0f0f0',
-                    dtick=2
+                    gridcolor='#f0f0f0'
                 ),
                 yaxis=dict(
                     title="Probability",
@@ -1039,7 +1204,208 @@ def show_sequential_page():
             with col2:
                 st.metric("Batches to 95%", steps_to_95 if steps_to_95 else "—")
             with col3:
-                st.metric("Total Batches", len(prob_history))
+                st.metric("Total Batches", prob_history[-1]['step'])
+            
+            if seq_test.window:
+                st.metric(f"P(B > A), last {seq_test.window} batches", f"{seq_test.get_window_probability():.1%}")
+    
+    # Stopping rule simulation
+    st.markdown('<div class="subsection-title">Stopping Rule Simulator</div>', unsafe_allow_html=True)
+    
+    st.markdown("""
+    <div class="info-message">
+        Replays thousands of sequential experiments at the observed rates and checks the stopping rule at every batch.
+        An A/A run at the baseline rate shows how often peeking declares a winner when there is none.
+    </div>
+    """, unsafe_allow_html=True)
+    
+    data_a = st.session_state.data['A']
+    data_b = st.session_state.data['B']
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        stop_rule = st.selectbox("Stopping rule", ["P(B > A)", "Expected loss"])
+    with col2:
+        if stop_rule == "P(B > A)":
+            stop_threshold = st.slider("Probability threshold", 0.80, 0.999, 0.95, 0.005)
+        else:
+            stop_threshold = st.number_input("Loss threshold", min_value=0.00001, max_value=0.05,
+                                             value=0.001, step=0.0005, format="%.5f")
+    with col3:
+        n_reps = st.select_slider("Replications", options=[1000, 5000, 10000, 20000, 50000], value=10000)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        sim_batches = st.slider("Looks (batches)", 5, 200, min(n_batches, 200), 5)
+    with col2:
+        sim_batch_size = st.number_input("Batch size per group", min_value=10,
+                                         value=max(10, int(data_a['trials'] // n_batches)), step=10)
+    
+    rate_a = data_a['successes'] / data_a['trials']
+    rate_b = data_b['successes'] / data_b['trials']
+    rule_kwargs = dict(
+        batch_size=int(sim_batch_size), n_batches=int(sim_batches), n_reps=int(n_reps),
+        rule='probability' if stop_rule == "P(B > A)" else 'loss'
+    )
+    if rule_kwargs['rule'] == 'probability':
+        rule_kwargs['threshold'] = stop_threshold
+    else:
+        rule_kwargs['loss_threshold'] = stop_threshold
+    
+    stopping_params = (rate_a, rate_b, tuple(sorted(rule_kwargs.items())))
+    stopping_job = current_job('stopping_rule', stopping_params)
+    if st.button("Simulate Stopping Rule", use_container_width=True):
+        stopping_job = submit_job('stopping_rule', stopping_params, simulate_stopping_rules,
+                                  rate_a, rate_b, **rule_kwargs)
+    
+    stopping = job_result(
+        'stopping_rule', stopping_job, f"Simulating {n_reps:,} sequential experiments",
+        describe=lambda partial: f"ship B at observed rates: {partial['observed']['decision_rates']['B']:.1%}"
+    )
+    if stopping is not None:
+        observed, null = stopping
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.metric("Ship B (observed rates)", f"{observed['decision_rates']['B']:.1%}")
+        with col2:
+            st.metric("Wrong decisions", f"{observed['error_rate']:.1%}"
+                      if np.isfinite(observed['error_rate']) else "—")
+        with col3:
+            st.metric("Mean batches to decision", f"{observed['mean_batches_to_decision']:.1f}"
+                      if np.isfinite(observed['mean_batches_to_decision']) else "—")
+        
+        if null['rule'] == 'probability':
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                st.metric("A/A false positives (peeking)", f"{null['error_rate']:.1%}")
+            with col2:
+                st.metric("A/A false positives (final look)", f"{null['fixed_horizon_error_rate']:.1%}")
+            with col3:
+                st.metric("Peeking inflation", f"{null['peeking_inflation']:.1f}×"
+                          if np.isfinite(null['peeking_inflation']) else "—")
+        else:
+            st.caption("With equal rates either variant costs nothing, so an A/A stop under the expected-loss "
+                       "rule is not a false positive. The grey bars show how soon the A/A runs stop.")
+        
+        fig_stop = go.Figure()
+        fig_stop.add_trace(go.Bar(
+            x=np.arange(1, observed['n_batches'] + 1),
+            y=observed['stop_counts'] / observed['n_reps'],
+            marker_color='#000000',
+            name='Observed rates'
+        ))
+        fig_stop.add_trace(go.Bar(
+            x=np.arange(1, null['n_batches'] + 1),
+            y=null['stop_counts'] / null['n_reps'],
+            marker_color='#999999',
+            name='A/A'
+        ))
+        fig_stop.update_layout(
+            height=300,
+            barmode='overlay',
+            margin=dict(l=20, r=20, t=30, b=20),
+            plot_bgcolor='white',
+            paper_bgcolor='white',
+            font=dict(family='Inter', size=11),
+            xaxis=dict(title="Batch at decision", gridcolor='#f0f0f0'),
+            yaxis=dict(title="Share of experiments", gridcolor='#f0f0f0', tickformat='.0%'),
+            legend=dict(orientation='h', y=1.1)
+        )
+        
+        with instrumentation.timer('app.render.stopping_rule'):
+            st.plotly_chart(fig_stop, use_container_width=True)
+    
+    show_live_monitoring(half_life, window)
+
+def render_live_tail():
+    tailer = st.session_state.tailer
+    if tailer is None:
+        return
+    try:
+        update = tailer.poll()
+    except (OSError, ValueError) as exc:
+        st.error(f"Could not read {tailer.path}: {exc}")
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("P(B > A)", f"{update['probability_B_beats_A']:.1%}")
+    with col2:
+        st.metric("Events ingested", f"{update['rows']:,}", f"+{update['new_rows']:,}")
+    with col3:
+        st.metric("Read this refresh", f"{update['new_bytes'] / 1024:,.1f} KB")
+    
+    if update['skipped']:
+        st.caption(f"{update['skipped']:,} malformed or non-A/B rows skipped")
+    if tailer.seq_test.window:
+        st.metric(f"P(B > A), last {tailer.seq_test.window} refreshes",
+                  f"{tailer.seq_test.get_window_probability():.1%}")
+    
+    prob_history = tailer.seq_test.get_probability_history(n_samples=None, max_points=MAX_PLOT_POINTS)
+    if prob_history:
+        prob_df = pd.DataFrame(prob_history)
+        fig_live = go.Figure(go.Scatter(
+            x=prob_df['step'],
+            y=prob_df['probability'],
+            mode='lines',
+            line=dict(color='#000000', width=2)
+        ))
+        fig_live.update_layout(
+            height=250,
+            margin=dict(l=20, r=20, t=30, b=20),
+            plot_bgcolor='white',
+            paper_bgcolor='white',
+            font=dict(family='Inter', size=11),
+            xaxis=dict(title="Refresh with new events", gridcolor='#f0f0f0'),
+            yaxis=dict(title="P(B > A)", gridcolor='#f0f0f0', range=[0, 1], tickformat='.0%'),
+            showlegend=False
+        )
+        st.plotly_chart(fig_live, use_container_width=True)
+
+def show_live_monitoring(half_life, window):
+    st.markdown('<div class="subsection-title">Live Monitoring</div>', unsafe_allow_html=True)
+    
+    st.markdown("""
+    <div class="info-message">
+        Follows a growing CSV event log (a header line, then one row per event). Each refresh reads only the
+        rows appended since the last one and adds them to the posterior as one batch.
+    </div>
+    """, unsafe_allow_html=True)
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        log_path = st.text_input("Event log path", value="")
+    with col2:
+        group_col = st.text_input("Variant column", value="group")
+    with col3:
+        outcome_col = st.text_input("Outcome column", value="converted")
+    
+    refresh_seconds = st.select_slider("Refresh every", options=[1, 2, 5, 10, 30], value=5,
+                                       format_func=lambda seconds: f"{seconds}s")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        if st.button("Start following", use_container_width=True, disabled=not log_path):
+            if os.path.exists(log_path):
+                st.session_state.tailer = EventLogTailer(log_path, group_col, outcome_col,
+                                                         half_life=half_life or None, window=window or None)
+            else:
+                st.error(f"{log_path} does not exist")
+    with col2:
+        if st.button("Stop following", use_container_width=True, disabled=st.session_state.tailer is None):
+            st.session_state.tailer = None
+    
+    if st.session_state.tailer is not None:
+        # Only this fragment reruns on each refresh
+        st.fragment(run_every=refresh_seconds)(render_live_tail)()
 
 def show_compare_page():
     st.markdown('<div class="section-title">Comparison</div>', unsafe_allow_html=True)
@@ -1207,6 +1573,61 @@ def show_compare_page():
         Bayesian probabilities ask "How likely is H₁ given this data and prior?"
     </div>
     """, unsafe_allow_html=True)
+    
+    # Always-valid inference over the sequential batches
+    st.markdown('<div class="subsection-title">Sequential Monitoring (mSPRT)</div>', unsafe_allow_html=True)
+    
+    seq_test = st.session_state.sequential_test
+    if seq_test is None or not seq_test.history['A'] or not seq_test.history['B']:
+        st.info("Run the sequential simulation to compare always-valid p-values with fixed-horizon ones")
+        return
+    
+    tau = st.select_slider("Mixing scale τ (expected |difference| in rate)",
+                           options=[0.002, 0.005, 0.01, 0.02, 0.05], value=0.01)
+    
+    looks = list(zip(seq_test.history['A'], seq_test.history['B']))
+    steps = np.array([obs_a['step'] for obs_a, _ in looks])
+    successes_a, trials_a, successes_b, trials_b = (
+        np.array([obs[i][key] for obs in looks])
+        for i, key in [(0, 'cumulative_successes'), (0, 'cumulative_trials'),
+                       (1, 'cumulative_successes'), (1, 'cumulative_trials')]
+    )
+    msprt = MixtureSPRT.batch_evaluate(successes_a, trials_a, successes_b, trials_b, tau=tau)
+    naive = FrequentistABTest.batch_proportion_test(successes_a, trials_a, successes_b, trials_b)
+    
+    fig_msprt = go.Figure()
+    fig_msprt.add_trace(go.Scatter(
+        x=steps, y=msprt['p_value'], mode='lines+markers',
+        line=dict(color='#000000', width=2), marker=dict(size=5), name='Always-valid p-value'
+    ))
+    fig_msprt.add_trace(go.Scatter(
+        x=steps, y=naive['p_value'], mode='lines',
+        line=dict(color='#999999', width=1.5, dash='dot'), name='Fixed-horizon p-value'
+    ))
+    fig_msprt.add_hline(y=0.05, line_dash="dash", line_color="#666666",
+                        annotation_text="α = 0.05", annotation_position="top left")
+    fig_msprt.update_layout(
+        height=300,
+        margin=dict(l=20, r=20, t=30, b=20),
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(family='Inter', size=11),
+        xaxis=dict(title="Batch Number", gridcolor='#f0f0f0'),
+        yaxis=dict(title="p-value", type='log', gridcolor='#f0f0f0'),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5)
+    )
+    st.plotly_chart(fig_msprt, use_container_width=True)
+    
+    first_rejection = steps[msprt['reject_null']][0] if msprt['reject_null'].any() else None
+    lower, upper = msprt['confidence_sequence'][-1]
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Always-valid p-value", f"{msprt['p_value'][-1]:.4f}")
+    with col2:
+        st.metric("95% confidence sequence", f"[{lower:.2%}, {upper:.2%}]")
+    with col3:
+        st.metric("First batch with p < 0.05", first_rejection if first_rejection is not None else "—")
 
 def show_design_page():
     st.markdown('<div class="section-title">Experiment Design</div>', unsafe_allow_html=True)
@@ -1316,6 +1737,40 @@ def show_design_page():
     
     st.plotly_chart(fig, use_container_width=True)
     
+    # Group-sequential design
+    st.markdown('<div class="subsection-title">Group-Sequential Boundaries</div>', unsafe_allow_html=True)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        design_looks = st.slider("Planned looks", 2, 20, 5, 1)
+    with col2:
+        design_spending = st.selectbox("Spending function", options=list(SPENDING_FUNCTIONS),
+                                       format_func=lambda kind: kind.replace('_', '-').title(),
+                                       key="design_spending")
+    
+    # One-sided test of B over A at half the two-sided significance level
+    boundaries = compute_boundaries(design_looks, alpha=alpha / 2, beta=1 - power, spending=design_spending)
+    max_n = int(np.ceil(required_n * boundaries['inflation_factor']))
+    
+    boundary_df = pd.DataFrame({
+        'Look': np.arange(1, design_looks + 1),
+        'Sample size per group': np.ceil(boundaries['information'] * max_n).astype(int),
+        'Stop for efficacy if z ≥': boundaries['efficacy_z'].round(3),
+        'Stop for futility if z ≤': boundaries['futility_z'].round(3),
+        'Cumulative α spent': boundaries['alpha_spent'].round(5)
+    })
+    st.dataframe(boundary_df, use_container_width=True, hide_index=True)
+    
+    st.markdown(f"""
+    <div style="margin-top: 1rem; padding: 1rem; background: #fafafa; border: 1px solid #e5e5e5; border-radius: 6px;">
+        <div style="display: flex; justify-content: space-between; align-items: center;">
+            <span style="color: #666666;">Maximum sample size per group (×{boundaries['inflation_factor']:.3f})</span>
+            <span style="font-weight: 600;">{max_n:,}</span>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+    
     # Scenario simulation
     st.markdown('<div class="subsection-title">Scenario Simulation</div>', unsafe_allow_html=True)
     
@@ -1328,33 +1783,21 @@ def show_design_page():
     with col3:
         sim_n = st.number_input("Sample size", min_value=100, max_value=10000, value=1000, step=100)
     
+    # Run multiple simulations
+    n_sims = 100
+    scenario_params = (sim_baseline, sim_treatment, sim_n, n_sims)
+    scenario_job = current_job('scenario', scenario_params)
     if st.button("Simulate Scenario", use_container_width=True):
-        # Run multiple simulations
-        n_sims = 100
-        bayesian_correct = 0
-        frequentist_correct = 0
-        
-        with st.spinner(f"Running {n_sims} simulations..."):
-            for i in range(n_sims):
-                # Generate data
-                data = generate_simulated_data(sim_baseline, sim_treatment, sim_n, sim_n, seed=i)
-                
-                # Bayesian
-                bayes_test = BayesianABTest(alpha_prior=1.0, beta_prior=1.0)
-                bayes_test.update_posterior(data['A']['successes'], data['A']['trials'], 'A')
-                bayes_test.update_posterior(data['B']['successes'], data['B']['trials'], 'B')
-                prob = bayes_test.probability_B_beats_A()
-                if (sim_treatment > sim_baseline and prob > 0.95) or (sim_treatment < sim_baseline and prob < 0.05):
-                    bayesian_correct += 1
-                
-                # Frequentist
-                prop_test = FrequentistABTest().proportion_test(
-                    data['A']['successes'], data['A']['trials'],
-                    data['B']['successes'], data['B']['trials']
-                )
-                if (sim_treatment > sim_baseline and prop_test['p_value'] < 0.05) or \
-                   (sim_treatment < sim_baseline and prop_test['p_value'] < 0.05):
-                    frequentist_correct += 1
+        scenario_job = submit_job('scenario', scenario_params, simulate_scenario,
+                                  sim_baseline, sim_treatment, sim_n, n_sims=n_sims)
+    
+    scenario = job_result(
+        'scenario', scenario_job, f"Running {n_sims} simulations",
+        describe=lambda partial: f"{partial['bayesian_correct']}/{partial['n_sims']} Bayesian correct so far"
+    )
+    if scenario is not None:
+        bayesian_correct = scenario['bayesian_correct']
+        frequentist_correct = scenario['frequentist_correct']
         
         col1, col2 = st.columns(2)
         with col1:
@@ -1,12 +1,19 @@
+from collections import deque
+
 import numpy as np
-from scipy import stats
-import pandas as pd
+
+import instrumentation
+from sketches import HistogramSketch
+
+DEFAULT_CHUNK_SIZE = 262144
 
 class BayesianABTest:
-    def __init__(self, alpha_prior=1, beta_prior=1):
+    def __init__(self, alpha_prior=1, beta_prior=1, rng=None):
         self.alpha_prior = alpha_prior
         self.beta_prior = beta_prior
         self.results = {}
+        # Accepts a Generator, a seed or None; each test owns its stream
+        self.rng = np.random.default_rng(rng)
         
     def update_posterior(self, successes, trials, group_name):
         alpha_posterior = self.alpha_prior + successes
@@ -24,37 +31,526 @@ class BayesianABTest:
         self.results[group_name] = posterior
         return posterior
     
-    def get_posterior_samples(self, group_name, n_samples=100000):
+    def get_posterior_samples(self, group_name, n_samples=100000, rng=None, dtype=np.float64):
         posterior = self.results[group_name]
-        samples = np.random.beta(
-            posterior['alpha'], 
-            posterior['beta'], 
-            n_samples
-        )
+        rng = self.rng if rng is None else rng
+        instrumentation.count('bayes.posterior_samples', n_samples)
+        with instrumentation.timer('bayes.sampling'):
+            if np.dtype(dtype) == np.float64:
+                samples = rng.beta(
+                    posterior['alpha'], 
+                    posterior['beta'], 
+                    n_samples
+                )
+            else:
+                # Generator.beta has no dtype argument; the gamma ratio does
+                x = rng.standard_gamma(posterior['alpha'], n_samples, dtype=dtype)
+                y = rng.standard_gamma(posterior['beta'], n_samples, dtype=dtype)
+                x /= x + y
+                samples = x
         return samples
     
-    def probability_B_beats_A(self, n_samples=100000):
+    def summarize_draws(self, n_samples=100000, chunk_size=DEFAULT_CHUNK_SIZE, dtype=np.float64, rng=None):
+        # One pass over n_samples posterior draws, chunk_size at a time. Peak
+        # memory is a few chunk-sized arrays regardless of n_samples; quantiles
+        # come from streaming histogram sketches instead of np.percentile.
         if 'A' not in self.results or 'B' not in self.results:
             raise ValueError("Both groups A and B must be updated first")
         
+        wins = 0
+        loss_choose_A = 0.0
+        loss_choose_B = 0.0
+        absolute_sketch = HistogramSketch()
+        relative_sketch = HistogramSketch(scale='log_ratio')
+        
+        for start in range(0, n_samples, chunk_size):
+            size = min(chunk_size, n_samples - start)
+            samples_A = self.get_posterior_samples('A', size, rng, dtype)
+            samples_B = self.get_posterior_samples('B', size, rng, dtype)
+            
+            uplift = samples_B - samples_A
+            wins += np.count_nonzero(uplift > 0)
+            loss_choose_A += float(np.maximum(uplift, 0).sum(dtype=np.float64))
+            loss_choose_B += float(np.maximum(-uplift, 0).sum(dtype=np.float64))
+            absolute_sketch.update(uplift)
+            
+            # Reuse the buffer for the relative uplift
+            uplift /= samples_A
+            uplift *= 100
+            relative_sketch.update(uplift)
+        
+        return {
+            'probability_B_beats_A': wins / n_samples,
+            'expected_loss_choose_A': loss_choose_A / n_samples,
+            'expected_loss_choose_B': loss_choose_B / n_samples,
+            'absolute_sketch': absolute_sketch,
+            'relative_sketch': relative_sketch
+        }
+    
+    def probability_B_beats_A(self, n_samples=100000, chunk_size=None, dtype=np.float64):
+        if 'A' not in self.results or 'B' not in self.results:
+            raise ValueError("Both groups A and B must be updated first")
+        
+        if chunk_size:
+            return self.summarize_draws(n_samples, chunk_size, dtype)['probability_B_beats_A']
+        
         samples_A = self.get_posterior_samples('A', n_samples)
         samples_B = self.get_posterior_samples('B', n_samples)
         
         prob_B_beats_A = np.mean(samples_B > samples_A)
         return prob_B_beats_A
     
-    def expected_loss(self, n_samples=100000):
+    def expected_loss(self, n_samples=100000, chunk_size=None, dtype=np.float64):
+        if chunk_size:
+            summary = self.summarize_draws(n_samples, chunk_size, dtype)
+            loss_choose_A = summary['expected_loss_choose_A']
+            loss_choose_B = summary['expected_loss_choose_B']
+        else:
+            samples_A = self.get_posterior_samples('A', n_samples)
+            samples_B = self.get_posterior_samples('B', n_samples)
+            
+            loss_choose_B = np.mean(np.maximum(0, samples_A - samples_B))
+            
+            loss_choose_A = np.mean(np.maximum(0, samples_B - samples_A))
+        
+        return {
+            'expected_loss_choose_A': loss_choose_A,
+            'expected_loss_choose_B': loss_choose_B,
+            'optimal_choice': 'B' if loss_choose_B < loss_choose_A else 'A'
+        }
+    
+    @staticmethod
+    def _uplift_summary(summary):
+        absolute_sketch = summary['absolute_sketch']
+        relative_sketch = summary['relative_sketch']
+        return {
+            'mean_absolute_uplift': absolute_sketch.mean,
+            'mean_relative_uplift': relative_sketch.mean,
+            'credible_interval_absolute': absolute_sketch.percentile([2.5, 97.5]),
+            'credible_interval_relative': relative_sketch.percentile([2.5, 97.5]),
+            'absolute_sketch': absolute_sketch,
+            'relative_sketch': relative_sketch
+        }
+    
+    def uplift_distribution(self, n_samples=100000, chunk_size=None, dtype=np.float64, summary_only=False):
+        # With chunk_size set, no per-sample arrays are returned; the
+        # distributions are summarized by 'absolute_sketch'/'relative_sketch'.
+        # summary_only goes further and returns only the statistics plus
+        # compact histogram/quantile tables, which are cheap to cache and plot.
+        if summary_only:
+            uplift_stats = self._uplift_summary(
+                self.summarize_draws(n_samples, chunk_size or DEFAULT_CHUNK_SIZE, dtype)
+            )
+            uplift_stats['absolute_histogram'] = uplift_stats.pop('absolute_sketch').to_summary()
+            uplift_stats['relative_histogram'] = uplift_stats.pop('relative_sketch').to_summary()
+            return uplift_stats
+        if chunk_size:
+            return self._uplift_summary(self.summarize_draws(n_samples, chunk_size, dtype))
+        
         samples_A = self.get_posterior_samples('A', n_samples)
         samples_B = self.get_posterior_samples('B', n_samples)
         
-        loss_choose_B = np.mean(np.maximum(0, samples_A - samples_B))
+        absolute_uplift = samples_B - samples_A
+        
+        relative_uplift = (samples_B - samples_A) / samples_A * 100
+        
+        with instrumentation.timer('bayes.percentiles'):
+            credible_interval_absolute = np.percentile(absolute_uplift, [2.5, 97.5])
+            credible_interval_relative = np.percentile(relative_uplift, [2.5, 97.5])
+        
+        return {
+            'absolute_uplift': absolute_uplift,
+            'relative_uplift': relative_uplift,
+            'mean_absolute_uplift': np.mean(absolute_uplift),
+            'mean_relative_uplift': np.mean(relative_uplift),
+            'credible_interval_absolute': credible_interval_absolute,
+            'credible_interval_relative': credible_interval_relative
+        }
+    
+    @instrumentation.timed('bayes.calculate_risk')
+    def calculate_risk(self, n_samples=100000, chunk_size=None, dtype=np.float64):
+        if chunk_size:
+            # Single chunked pass shared by all metrics; no per-sample arrays are kept
+            summary = self.summarize_draws(n_samples, chunk_size, dtype)
+            prob_B_beats_A = summary['probability_B_beats_A']
+            uplift_stats = self._uplift_summary(summary)
+            loss = {
+                'expected_loss_choose_A': summary['expected_loss_choose_A'],
+                'expected_loss_choose_B': summary['expected_loss_choose_B'],
+                'optimal_choice': ('B' if summary['expected_loss_choose_B'] < summary['expected_loss_choose_A']
+                                   else 'A')
+            }
+        else:
+            prob_B_beats_A = self.probability_B_beats_A(n_samples)
+            uplift_stats = self.uplift_distribution(n_samples)
+            loss = self.expected_loss(n_samples)
+        
+        return {
+            'probability_B_beats_A': prob_B_beats_A,
+            'probability_A_beats_B': 1 - prob_B_beats_A,
+            'expected_uplift': uplift_stats['mean_relative_uplift'],
+            'uplift_ci': uplift_stats['credible_interval_relative'],
+            'expected_loss_choose_A': loss['expected_loss_choose_A'],
+            'expected_loss_choose_B': loss['expected_loss_choose_B'],
+            'recommended_choice': loss['optimal_choice']
+        }
+    
+    @staticmethod
+    def _beta_nodes(alpha, beta, n_nodes, by_quantile=None):
+        # Nodes and normalized weights for expectations under Beta(alpha, beta):
+        # Gauss-Legendre over +/-10 SDs weighted by the density, or over the
+        # quantiles where by_quantile is set (by default where a shape is below
+        # 1, i.e. the density is unbounded at 0 or 1)
+        from scipy import special
+        
+        nodes, weights = np.polynomial.legendre.leggauss(n_nodes)
+        total = alpha + beta
+        mean = alpha / total
+        sd = np.sqrt(alpha * beta / (total ** 2 * (total + 1)))
+        lower = np.clip(mean - 10 * sd, 0, 1)[..., None]
+        half_width = (np.clip(mean + 10 * sd, 0, 1)[..., None] - lower) / 2
+        x = lower + half_width * (nodes + 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            w = half_width * weights * np.exp(
+                (alpha[..., None] - 1) * np.log(x) + (beta[..., None] - 1) * np.log1p(-x)
+                - special.betaln(alpha, beta)[..., None]
+            )
+            w /= w.sum(axis=-1, keepdims=True)
+        
+        if by_quantile is None:
+            by_quantile = np.minimum(alpha, beta) < 1
+        if by_quantile.any():
+            x[by_quantile] = special.betaincinv(alpha[by_quantile, None], beta[by_quantile, None], (nodes + 1) / 2)
+            w[by_quantile] = weights / 2
+        return x, w
+    
+    @staticmethod
+    def _quadrature(alpha_A, beta_A, alpha_B, beta_B, n_nodes=96):
+        # P(B > A) and E[max(0, A - B)] as integrals over X, the narrower of the
+        # two posteriors, against closed-form functions of the other one's (Y's)
+        # regularized incomplete beta. Integrating over the wider one would
+        # leave Y's CDF a near-step between the nodes.
+        from scipy import special
+        
+        alpha_A, beta_A, alpha_B, beta_B = np.broadcast_arrays(alpha_A, beta_A, alpha_B, beta_B)
+        variance_A = alpha_A * beta_A / ((alpha_A + beta_A) ** 2 * (alpha_A + beta_A + 1))
+        variance_B = alpha_B * beta_B / ((alpha_B + beta_B) ** 2 * (alpha_B + beta_B + 1))
+        over_A = variance_A < variance_B
+        alpha_X, beta_X = np.where(over_A, alpha_A, alpha_B), np.where(over_A, beta_A, beta_B)
+        alpha_Y, beta_Y = np.where(over_A, alpha_B, alpha_A), np.where(over_A, beta_B, beta_A)
+        # Y's CDF is not smooth at 0 or 1 either when one of its shapes is below 1
+        by_quantile = np.minimum(np.minimum(alpha_A, beta_A), np.minimum(alpha_B, beta_B)) < 1
+        x, w = BayesianABTest._beta_nodes(alpha_X, beta_X, n_nodes, by_quantile)
         
-        loss_choose_A = np.mean(np.maximum(0, samples_B - samples_A))
+        a, b = alpha_Y[..., None], beta_Y[..., None]
+        cdf_Y = special.betainc(a, b, x)
+        # E[Y; Y < x] = E[Y] * P(Y' < x) with Y' ~ Beta(a + 1, b)
+        partial_Y = a / (a + b) * special.betainc(a + 1, b, x)
+        over_A = over_A[..., None]
+        # Over B: P(A < x) and E[max(0, A - x)]; over A: P(B > x) and E[max(0, x - B)]
+        prob_B_beats_A = np.where(over_A, 1 - cdf_Y, cdf_Y)
+        loss_choose_B = np.where(over_A, x * cdf_Y - partial_Y, a / (a + b) - partial_Y - x * (1 - cdf_Y))
+        
+        return (np.clip((w * prob_B_beats_A).sum(axis=-1), 0, 1),
+                np.maximum((w * loss_choose_B).sum(axis=-1), 0))
+    
+    @staticmethod
+    def _posterior_arrays(successes_A, trials_A, successes_B, trials_B, alpha_prior, beta_prior):
+        successes_A, trials_A, successes_B, trials_B, alpha_prior, beta_prior = np.broadcast_arrays(
+            *(np.asarray(v, dtype=float)
+              for v in (successes_A, trials_A, successes_B, trials_B, alpha_prior, beta_prior))
+        )
+        return (alpha_prior + successes_A, beta_prior + trials_A - successes_A,
+                alpha_prior + successes_B, beta_prior + trials_B - successes_B)
+    
+    @staticmethod
+    def _ratio_quantiles(alpha_A, beta_A, alpha_B, beta_B, q, n_nodes=64, tol=1e-6, max_iter=100):
+        # Exact quantiles of B / A for independent Beta posteriors. The CDF
+        # P(Y / X <= r) = E[I_{rX}(Y)] is integrated over X, the narrower of the
+        # two on the log scale, which keeps the integrand smooth; its roots are
+        # found by safeguarded Newton steps on log r, starting from the
+        # log-normal approximation.
+        from scipy import special
+        
+        q = np.asarray(q, dtype=float)
+        shape = alpha_A.shape + q.shape
+        log_var_A = special.polygamma(1, alpha_A) - special.polygamma(1, alpha_A + beta_A)
+        log_var_B = special.polygamma(1, alpha_B) - special.polygamma(1, alpha_B + beta_B)
+        log_mean = (special.digamma(alpha_B) - special.digamma(alpha_B + beta_B)
+                    - special.digamma(alpha_A) + special.digamma(alpha_A + beta_A))
+        guess = log_mean[..., None] + special.ndtri(q) * np.sqrt(log_var_A + log_var_B)[..., None]
+        
+        # When B is the narrower one, solve for the (1 - q) quantile of A / B instead
+        swap = log_var_B < log_var_A
+        alpha_X, beta_X = np.where(swap, alpha_B, alpha_A).ravel(), np.where(swap, beta_B, beta_A).ravel()
+        alpha_Y, beta_Y = np.where(swap, alpha_A, alpha_B).ravel(), np.where(swap, beta_A, beta_B).ravel()
+        flip = np.broadcast_to(swap[..., None], shape).ravel()
+        level = np.where(flip, 1 - np.broadcast_to(q, shape).ravel(), np.broadcast_to(q, shape).ravel())
+        row = np.repeat(np.arange(alpha_X.size), q.size)
+        
+        x, w = BayesianABTest._beta_nodes(alpha_X, beta_X, n_nodes)
+        
+        alpha_Y, beta_Y = alpha_Y[row], beta_Y[row]
+        log_norm_Y = special.betaln(alpha_Y, beta_Y)
+        log_ratio = np.where(flip, -1, 1) * guess.ravel()
+        # Bracket of the root on the log scale, narrowed as the iterates bound it
+        limit = -np.log(np.finfo(float).tiny)
+        lo, hi = np.full(log_ratio.shape, -limit), np.full(log_ratio.shape, limit)
+        
+        active = np.arange(log_ratio.size)
+        for _ in range(max_iter):
+            if active.size == 0:
+                break
+            current = log_ratio[active]
+            a, b = alpha_Y[active, None], beta_Y[active, None]
+            y = np.minimum(np.exp(current)[:, None] * x[row[active]], 1)
+            w_active = w[row[active]]
+            cdf = (w_active * special.betainc(a, b, y)).sum(axis=-1)
+            with np.errstate(divide='ignore', over='ignore', invalid='ignore'):
+                # d/d(log r) of I_{rx}(Y) is rx * f_Y(rx)
+                density = np.where(
+                    y < 1, np.exp(a * np.log(y) + (b - 1) * np.log1p(-y) - log_norm_Y[active, None]), 0
+                )
+                step = (cdf - level[active]) / (w_active * density).sum(axis=-1)
+            
+            below = cdf < level[active]
+            lo[active] = np.where(below, current, lo[active])
+            hi[active] = np.where(below, hi[active], current)
+            proposed = current - step
+            proposed = np.where((proposed >= lo[active]) & (proposed <= hi[active]), proposed,
+                                (lo[active] + hi[active]) / 2)
+            log_ratio[active] = proposed
+            active = active[(np.abs(proposed - current) > tol) & (hi[active] - lo[active] > tol)]
+        
+        return np.exp(np.where(flip, -log_ratio, log_ratio)).reshape(shape)
+    
+    @classmethod
+    def batch_relative_uplift(cls, alpha_A, beta_A, alpha_B, beta_B, interval=(2.5, 97.5)):
+        alpha_A, beta_A, alpha_B, beta_B = np.broadcast_arrays(
+            *(np.asarray(p, dtype=float) for p in (alpha_A, beta_A, alpha_B, beta_B))
+        )
+        # E[B / A] = E[B] * E[1 / A] is exact (and infinite when alpha_A <= 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_ratio = np.where(
+                alpha_A > 1,
+                alpha_B / (alpha_B + beta_B) * (alpha_A + beta_A - 1) / (alpha_A - 1),
+                np.inf
+            )
+        ci = cls._ratio_quantiles(alpha_A, beta_A, alpha_B, beta_B, np.asarray(interval, dtype=float) / 100)
         
         return {
+            'mean_relative_uplift': (mean_ratio - 1) * 100,
+            'credible_interval_relative': (ci - 1) * 100
+        }
+    
+    @classmethod
+    @instrumentation.timed('bayes.batch_calculate_risk')
+    def batch_calculate_risk(cls, successes_A, trials_A, successes_B, trials_B,
+                             alpha_prior=1, beta_prior=1):
+        alpha_A, beta_A, alpha_B, beta_B = cls._posterior_arrays(
+            successes_A, trials_A, successes_B, trials_B, alpha_prior, beta_prior
+        )
+        instrumentation.count('bayes.batch_experiments', alpha_A.size)
+        prob_B_beats_A, loss_choose_B = cls._quadrature(alpha_A, beta_A, alpha_B, beta_B)
+        # E[max(0, B - A)] - E[max(0, A - B)] = E[B] - E[A]
+        loss_choose_A = np.maximum(
+            loss_choose_B + alpha_B / (alpha_B + beta_B) - alpha_A / (alpha_A + beta_A), 0
+        )
+        uplift_stats = cls.batch_relative_uplift(alpha_A, beta_A, alpha_B, beta_B)
+        
+        return {
+            'probability_B_beats_A': prob_B_beats_A,
+            'probability_A_beats_B': 1 - prob_B_beats_A,
+            'expected_uplift': uplift_stats['mean_relative_uplift'],
+            'uplift_ci': uplift_stats['credible_interval_relative'],
             'expected_loss_choose_A': loss_choose_A,
             'expected_loss_choose_B': loss_choose_B,
-            'optimal_choice': 'B' if loss_choose_B < loss_choose_A else 'A'
+            'recommended_choice': np.where(loss_choose_B < loss_choose_A, 'B', 'A')
+        }
+    
+    @instrumentation.timed('bayes.prior_sensitivity')
+    def prior_sensitivity(self, alpha_priors, beta_priors):
+        # The observed counts scored under every prior in one broadcast
+        # batch_calculate_risk call. alpha_priors and beta_priors broadcast
+        # against each other (e.g. the 2-D grids from utils.prior_grid), and
+        # every metric takes their shape; uplift_ci adds a last axis.
+        if 'A' not in self.results or 'B' not in self.results:
+            raise ValueError("Both groups A and B must be updated first")
+        
+        alpha_priors, beta_priors = np.broadcast_arrays(np.asarray(alpha_priors, dtype=float),
+                                                        np.asarray(beta_priors, dtype=float))
+        counts = [self.results[group][key] for group in ['A', 'B'] for key in ['successes', 'trials']]
+        sensitivity = self.batch_calculate_risk(*counts, alpha_priors, beta_priors)
+        sensitivity['alpha_prior'] = alpha_priors
+        sensitivity['beta_prior'] = beta_priors
+        return sensitivity
+
+    def save(self, path, name='default'):
+        from snapshots import save_snapshot
+        
+        save_snapshot(path, {name: self})
+    
+    @classmethod
+    def load(cls, path, name=None, rng=None):
+        from snapshots import load_snapshot
+        
+        test = load_snapshot(path, name, rng)
+        if not isinstance(test, cls):
+            raise TypeError(f"Snapshot holds a {type(test).__name__}, not a {cls.__name__}")
+        return test
+
+
+class GammaPoissonABTest:
+    def __init__(self, alpha_prior=1, beta_prior=1, rng=None):
+        # Gamma(shape=alpha_prior, rate=beta_prior) prior on the event rate
+        self.alpha_prior = alpha_prior
+        self.beta_prior = beta_prior
+        self.results = {}
+        self.rng = np.random.default_rng(rng)
+    
+    def update_posterior(self, events, exposure, group_name):
+        alpha_posterior = self.alpha_prior + events
+        beta_posterior = self.beta_prior + exposure
+        
+        posterior = {
+            'alpha': alpha_posterior,
+            'beta': beta_posterior,
+            'events': events,
+            'exposure': exposure,
+            'event_rate': events / exposure if exposure > 0 else 0,
+            'posterior_mean': alpha_posterior / beta_posterior
+        }
+        
+        self.results[group_name] = posterior
+        return posterior
+    
+    def add_observations(self, events, exposure, group_name):
+        # Incremental update: the posterior only depends on the running totals
+        if group_name in self.results:
+            events = self.results[group_name]['events'] + events
+            exposure = self.results[group_name]['exposure'] + exposure
+        return self.update_posterior(events, exposure, group_name)
+    
+    def get_posterior_samples(self, group_name, n_samples=100000, rng=None):
+        posterior = self.results[group_name]
+        rng = self.rng if rng is None else rng
+        instrumentation.count('gamma_poisson.posterior_samples', n_samples)
+        samples = rng.gamma(
+            posterior['alpha'],
+            1 / posterior['beta'],
+            n_samples
+        )
+        return samples
+    
+    def _posterior_params(self):
+        if 'A' not in self.results or 'B' not in self.results:
+            raise ValueError("Both groups A and B must be updated first")
+        
+        return (self.results['A']['alpha'], self.results['A']['beta'],
+                self.results['B']['alpha'], self.results['B']['beta'])
+    
+    @staticmethod
+    def batch_probability_B_beats_A(alpha_A, beta_A, alpha_B, beta_B):
+        # With X = beta_A * rate_A and Y = beta_B * rate_B, Y / (X + Y) ~ Beta(alpha_B, alpha_A),
+        # so P(rate_B > rate_A) is a regularized incomplete beta function.
+        from scipy import special
+        
+        alpha_A, beta_A, alpha_B, beta_B = np.broadcast_arrays(
+            *(np.asarray(p, dtype=float) for p in (alpha_A, beta_A, alpha_B, beta_B))
+        )
+        return special.betainc(alpha_A, alpha_B, beta_A / (beta_A + beta_B))
+    
+    @staticmethod
+    def batch_expected_loss(alpha_A, beta_A, alpha_B, beta_B):
+        alpha_A, beta_A, alpha_B, beta_B = np.broadcast_arrays(
+            *(np.asarray(p, dtype=float) for p in (alpha_A, beta_A, alpha_B, beta_B))
+        )
+        mean_A = alpha_A / beta_A
+        mean_B = alpha_B / beta_B
+        
+        # E[max(0, B - A)] = E[B; B > A] - E[A; B > A], and E[X; event] for a Gamma
+        # variable equals its mean times the probability under shape + 1.
+        loss_choose_A = (
+            mean_B * GammaPoissonABTest.batch_probability_B_beats_A(alpha_A, beta_A, alpha_B + 1, beta_B)
+            - mean_A * GammaPoissonABTest.batch_probability_B_beats_A(alpha_A + 1, beta_A, alpha_B, beta_B)
+        )
+        loss_choose_A = np.maximum(loss_choose_A, 0)
+        loss_choose_B = np.maximum(loss_choose_A - (mean_B - mean_A), 0)
+        
+        return {
+            'expected_loss_choose_A': loss_choose_A,
+            'expected_loss_choose_B': loss_choose_B,
+            'optimal_choice': np.where(loss_choose_B < loss_choose_A, 'B', 'A')
+        }
+    
+    @staticmethod
+    def batch_relative_uplift(alpha_A, beta_A, alpha_B, beta_B, interval=(2.5, 97.5)):
+        alpha_A, beta_A, alpha_B, beta_B = np.broadcast_arrays(
+            *(np.asarray(p, dtype=float) for p in (alpha_A, beta_A, alpha_B, beta_B))
+        )
+        # rate_B / rate_A = (beta_A / beta_B) * BetaPrime(alpha_B, alpha_A), and
+        # BetaPrime quantiles are x / (1 - x) for the matching Beta quantile x.
+        from scipy import special
+        
+        scale = beta_A / beta_B
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_ratio = np.where(alpha_A > 1, scale * alpha_B / (alpha_A - 1), np.inf)
+        
+        q = np.asarray(interval, dtype=float) / 100
+        x = special.betaincinv(alpha_B[..., None], alpha_A[..., None], q)
+        ci = x / (1 - x) * scale[..., None]
+        
+        return {
+            'mean_relative_uplift': (mean_ratio - 1) * 100,
+            'credible_interval_relative': (ci - 1) * 100
+        }
+    
+    @classmethod
+    @instrumentation.timed('gamma_poisson.batch_calculate_risk')
+    def batch_calculate_risk(cls, events_A, exposure_A, events_B, exposure_B,
+                             alpha_prior=1, beta_prior=1):
+        alpha_A = alpha_prior + np.asarray(events_A, dtype=float)
+        beta_A = beta_prior + np.asarray(exposure_A, dtype=float)
+        alpha_B = alpha_prior + np.asarray(events_B, dtype=float)
+        beta_B = beta_prior + np.asarray(exposure_B, dtype=float)
+        
+        prob_B_beats_A = cls.batch_probability_B_beats_A(alpha_A, beta_A, alpha_B, beta_B)
+        uplift_stats = cls.batch_relative_uplift(alpha_A, beta_A, alpha_B, beta_B)
+        loss = cls.batch_expected_loss(alpha_A, beta_A, alpha_B, beta_B)
+        
+        return {
+            'probability_B_beats_A': prob_B_beats_A,
+            'probability_A_beats_B': 1 - prob_B_beats_A,
+            'expected_uplift': uplift_stats['mean_relative_uplift'],
+            'uplift_ci': uplift_stats['credible_interval_relative'],
+            'expected_loss_choose_A': loss['expected_loss_choose_A'],
+            'expected_loss_choose_B': loss['expected_loss_choose_B'],
+            'recommended_choice': loss['optimal_choice']
+        }
+    
+    @instrumentation.timed('gamma_poisson.prior_sensitivity')
+    def prior_sensitivity(self, alpha_priors, beta_priors):
+        # Gamma(alpha_prior, beta_prior) priors, broadcast as in
+        # BayesianABTest.prior_sensitivity
+        self._posterior_params()
+        
+        alpha_priors, beta_priors = np.broadcast_arrays(np.asarray(alpha_priors, dtype=float),
+                                                        np.asarray(beta_priors, dtype=float))
+        counts = [self.results[group][key] for group in ['A', 'B'] for key in ['events', 'exposure']]
+        sensitivity = self.batch_calculate_risk(*counts, alpha_priors, beta_priors)
+        sensitivity['alpha_prior'] = alpha_priors
+        sensitivity['beta_prior'] = beta_priors
+        return sensitivity
+    
+    def probability_B_beats_A(self):
+        return float(self.batch_probability_B_beats_A(*self._posterior_params()))
+    
+    def expected_loss(self):
+        loss = self.batch_expected_loss(*self._posterior_params())
+        return {
+            'expected_loss_choose_A': float(loss['expected_loss_choose_A']),
+            'expected_loss_choose_B': float(loss['expected_loss_choose_B']),
+            'optimal_choice': str(loss['optimal_choice'])
         }
     
     def uplift_distribution(self, n_samples=100000):
@@ -74,21 +570,152 @@ class BayesianABTest:
             'credible_interval_relative': np.percentile(relative_uplift, [2.5, 97.5])
         }
     
-    def calculate_risk(self, n_samples=100000):
-        prob_B_beats_A = self.probability_B_beats_A(n_samples)
-        uplift_stats = self.uplift_distribution(n_samples)
-        loss = self.expected_loss(n_samples)
+    @instrumentation.timed('gamma_poisson.calculate_risk')
+    def calculate_risk(self):
+        alpha_A, beta_A, alpha_B, beta_B = self._posterior_params()
+        prob_B_beats_A = self.probability_B_beats_A()
+        uplift_stats = self.batch_relative_uplift(alpha_A, beta_A, alpha_B, beta_B)
+        loss = self.expected_loss()
         
         return {
             'probability_B_beats_A': prob_B_beats_A,
             'probability_A_beats_B': 1 - prob_B_beats_A,
-            'expected_uplift': uplift_stats['mean_relative_uplift'],
+            'expected_uplift': float(uplift_stats['mean_relative_uplift']),
             'uplift_ci': uplift_stats['credible_interval_relative'],
             'expected_loss_choose_A': loss['expected_loss_choose_A'],
             'expected_loss_choose_B': loss['expected_loss_choose_B'],
             'recommended_choice': loss['optimal_choice']
         }
 
+class MultiMetricExperiment:
+    # One experiment, many metrics: each metric is a BayesianABTest
+    # ('binomial') or GammaPoissonABTest ('count'). evaluate() draws all
+    # metrics together, so joint statements such as "primary wins and no
+    # guardrail degrades" come from one shared set of draws.
+    METRIC_KINDS = {'binomial': BayesianABTest, 'count': GammaPoissonABTest}
+    
+    def __init__(self, rng=None):
+        self.metrics = {}
+        self.primary = None
+        self.rng = np.random.default_rng(rng)
+    
+    def add_metric(self, name, kind='binomial', alpha_prior=1, beta_prior=1,
+                   higher_is_better=True, primary=False):
+        if kind not in self.METRIC_KINDS:
+            raise ValueError(f"Unknown metric kind {kind!r}")
+        test = self.METRIC_KINDS[kind](alpha_prior, beta_prior, rng=self.rng)
+        self.metrics[name] = {'kind': kind, 'test': test, 'higher_is_better': higher_is_better}
+        if primary or self.primary is None:
+            self.primary = name
+        return test
+    
+    def update_posterior(self, name, successes, trials, group_name):
+        # Same order as the metric's own update_posterior; successes/trials
+        # are events/exposure for count metrics
+        return self.metrics[name]['test'].update_posterior(successes, trials, group_name)
+    
+    @property
+    def guardrails(self):
+        return [name for name in self.metrics if name != self.primary]
+    
+    def _draw(self, group_name, size):
+        # One generator call per metric kind: (n_metrics, size) draws
+        metrics = list(self.metrics.values())
+        draws = np.empty((len(metrics), size))
+        for kind in self.METRIC_KINDS:
+            rows = [i for i, metric in enumerate(metrics) if metric['kind'] == kind]
+            if not rows:
+                continue
+            posteriors = [metrics[i]['test'].results[group_name] for i in rows]
+            alpha = np.array([p['alpha'] for p in posteriors], dtype=float)[:, None]
+            beta = np.array([p['beta'] for p in posteriors], dtype=float)[:, None]
+            if kind == 'binomial':
+                draws[rows] = self.rng.beta(alpha, beta, (len(rows), size))
+            else:
+                draws[rows] = self.rng.gamma(alpha, 1 / beta, (len(rows), size))
+        return draws
+    
+    @instrumentation.timed('multi_metric.evaluate')
+    def evaluate(self, n_samples=100000, guardrail_tolerance=1.0, conditions=None,
+                 chunk_size=DEFAULT_CHUNK_SIZE):
+        # guardrail_tolerance is in percent: a guardrail "degrades" when its
+        # relative change in the bad direction exceeds it. conditions maps a
+        # label to a function of {metric: relative uplift in percent, signed
+        # so that positive is better} returning a boolean array.
+        if not self.metrics:
+            raise ValueError("Add at least one metric first")
+        for name, metric in self.metrics.items():
+            if 'A' not in metric['test'].results or 'B' not in metric['test'].results:
+                raise ValueError(f"Both groups A and B must be updated for metric {name!r}")
+        
+        names = list(self.metrics)
+        conditions = conditions or {}
+        sign = np.array([1.0 if self.metrics[name]['higher_is_better'] else -1.0 for name in names])[:, None]
+        primary = names.index(self.primary)
+        guardrail_rows = [i for i in range(len(names)) if i != primary]
+        
+        wins = np.zeros(len(names))
+        degrades = np.zeros(len(names))
+        loss_choose_A = np.zeros(len(names))
+        loss_choose_B = np.zeros(len(names))
+        sketches = [HistogramSketch(scale='log_ratio') for _ in names]
+        primary_wins = guardrails_hold = joint = 0
+        condition_counts = dict.fromkeys(conditions, 0)
+        
+        # Chunk over draws so that the (n_metrics, chunk) arrays stay bounded
+        step = max(chunk_size // len(names), 1)
+        for start in range(0, n_samples, step):
+            size = min(step, n_samples - start)
+            samples_A = self._draw('A', size)
+            samples_B = self._draw('B', size)
+            
+            improvement = (samples_B - samples_A) * sign
+            loss_choose_A += np.maximum(improvement, 0).sum(axis=1)
+            loss_choose_B += np.maximum(-improvement, 0).sum(axis=1)
+            relative = (samples_B - samples_A) / samples_A * 100
+            for sketch, row in zip(sketches, relative):
+                sketch.update(row)
+            relative *= sign
+            
+            better = relative > 0
+            degraded = relative < -guardrail_tolerance
+            wins += better.sum(axis=1)
+            degrades += degraded.sum(axis=1)
+            
+            primary_better = better[primary]
+            no_degradation = ~degraded[guardrail_rows].any(axis=0)
+            primary_wins += np.count_nonzero(primary_better)
+            guardrails_hold += np.count_nonzero(no_degradation)
+            joint += np.count_nonzero(primary_better & no_degradation)
+            
+            if conditions:
+                draws = dict(zip(names, relative))
+                for label, condition in conditions.items():
+                    condition_counts[label] += np.count_nonzero(condition(draws))
+        
+        metrics = {}
+        for i, name in enumerate(names):
+            metrics[name] = {
+                'kind': self.metrics[name]['kind'],
+                'higher_is_better': self.metrics[name]['higher_is_better'],
+                'probability_B_better': wins[i] / n_samples,
+                'probability_degrades': degrades[i] / n_samples,
+                'expected_uplift': sketches[i].mean,
+                'uplift_ci': sketches[i].percentile([2.5, 97.5]),
+                'expected_loss_choose_A': loss_choose_A[i] / n_samples,
+                'expected_loss_choose_B': loss_choose_B[i] / n_samples
+            }
+        
+        return {
+            'primary': self.primary,
+            'guardrails': self.guardrails,
+            'n_samples': n_samples,
+            'metrics': metrics,
+            'probability_primary_wins': primary_wins / n_samples,
+            'probability_no_guardrail_degrades': guardrails_hold / n_samples,
+            'probability_primary_wins_without_degradation': joint / n_samples,
+            'conditions': {label: count / n_samples for label, count in condition_counts.items()}
+        }
 
 class FrequentistABTest:
     @staticmethod
@@ -133,53 +760,386 @@ class FrequentistABTest:
             'ci_difference': ci_diff,
             'significant_at_0.05': p_value < 0.05
         }
+    
+    @staticmethod
+    def _count_arrays(successes_A, trials_A, successes_B, trials_B):
+        return np.broadcast_arrays(
+            *(np.asarray(v, dtype=float) for v in (successes_A, trials_A, successes_B, trials_B))
+        )
+    
+    @classmethod
+    @instrumentation.timed('frequentist.batch_chi_squared')
+    def batch_chi_squared_test(cls, successes_A, trials_A, successes_B, trials_B, correction=True):
+        # Closed form of chi2_contingency for 2x2 tables: every cell deviates
+        # from its expected count by |ad - bc| / N, less 0.5 with Yates' correction
+        from scipy import special
+        
+        successes_A, trials_A, successes_B, trials_B = cls._count_arrays(
+            successes_A, trials_A, successes_B, trials_B
+        )
+        failures_A = trials_A - successes_A
+        failures_B = trials_B - successes_B
+        total = trials_A + trials_B
+        successes = successes_A + successes_B
+        failures = failures_A + failures_B
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            deviation = np.abs(successes_A * failures_B - failures_A * successes_B) / total
+            if correction:
+                deviation = np.maximum(deviation - 0.5, 0)
+            # E = row total * column total / N, summed as 1 / E over the four cells
+            chi2 = deviation ** 2 * total * (1 / (trials_A * successes) + 1 / (trials_A * failures)
+                                             + 1 / (trials_B * successes) + 1 / (trials_B * failures))
+        # chi2_contingency rejects tables with a zero expected count
+        valid = (trials_A > 0) & (trials_B > 0) & (successes > 0) & (failures > 0)
+        chi2 = np.where(valid, chi2, np.nan)
+        p_value = special.chdtrc(1, chi2)
+        
+        return {
+            'chi2_statistic': chi2,
+            'p_value': p_value,
+            'degrees_of_freedom': np.ones_like(chi2, dtype=int),
+            'significant_at_0.05': p_value < 0.05
+        }
+    
+    @classmethod
+    @instrumentation.timed('frequentist.batch_proportion')
+    def batch_proportion_test(cls, successes_A, trials_A, successes_B, trials_B):
+        # Pooled two-sample z-test, as in proportions_ztest; the CI matches proportion_test
+        from scipy import special
+        
+        successes_A, trials_A, successes_B, trials_B = cls._count_arrays(
+            successes_A, trials_A, successes_B, trials_B
+        )
+        with np.errstate(divide='ignore', invalid='ignore'):
+            p_A = successes_A / trials_A
+            p_B = successes_B / trials_B
+            pooled_p = (successes_A + successes_B) / (trials_A + trials_B)
+            se = np.sqrt(pooled_p * (1 - pooled_p) * (1 / trials_A + 1 / trials_B))
+            z_stat = (p_A - p_B) / se
+        p_value = 2 * special.ndtr(-np.abs(z_stat))
+        difference = p_B - p_A
+        
+        return {
+            'z_statistic': z_stat,
+            'p_value': p_value,
+            'difference': difference,
+            'ci_difference': difference[..., None] + np.array([-1, 1]) * 1.96 * se[..., None],
+            'significant_at_0.05': p_value < 0.05
+        }
+
+
+class MixtureSPRT:
+    # Mixture sequential probability ratio test on the difference in
+    # conversion rates, with a N(0, tau^2) mixing distribution over the
+    # effect and a normal approximation to the estimated difference. The
+    # p-value and confidence sequence stay valid however often they are
+    # checked. State is the running counts per arm plus the running
+    # p-value and interval.
+    def __init__(self, tau=0.01, alpha=0.05):
+        self.tau = tau
+        self.alpha = alpha
+        self.counts = {'A': [0, 0], 'B': [0, 0]}
+        self.steps = {'A': 0, 'B': 0}
+        self.p_value = 1.0
+        self.confidence_sequence = (-1.0, 1.0)
+        self.history = []
+    
+    @staticmethod
+    def _evaluate(successes_A, trials_A, successes_B, trials_B, tau, alpha):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            p_A = successes_A / trials_A
+            p_B = successes_B / trials_B
+            difference = p_B - p_A
+            variance = p_A * (1 - p_A) / trials_A + p_B * (1 - p_B) / trials_B
+            tau2 = tau ** 2
+            log_likelihood_ratio = (0.5 * np.log(variance / (variance + tau2))
+                                    + difference ** 2 * tau2 / (2 * variance * (variance + tau2)))
+            half_width = np.sqrt(variance * (variance + tau2) / tau2
+                                 * (2 * np.log(1 / alpha) + np.log((variance + tau2) / variance)))
+        # No variance yet (no data, or all/no conversions): no evidence either way
+        informative = variance > 0
+        p_value = np.where(informative, np.minimum(1, np.exp(-log_likelihood_ratio)), 1.0)
+        lower = np.where(informative, np.maximum(difference - half_width, -1), -1.0)
+        upper = np.where(informative, np.minimum(difference + half_width, 1), 1.0)
+        return difference, p_value, lower, upper
+    
+    def add_observation(self, group, success, trial):
+        # Same batches as SequentialBayesianTest.add_observation; a look is
+        # taken once both arms have received the same number of batches
+        self.counts[group][0] += success
+        self.counts[group][1] += trial
+        self.steps[group] += 1
+        if self.steps['A'] != self.steps['B']:
+            return None
+        
+        (successes_A, trials_A), (successes_B, trials_B) = self.counts['A'], self.counts['B']
+        difference, p_value, lower, upper = (float(v) for v in self._evaluate(
+            successes_A, trials_A, successes_B, trials_B, self.tau, self.alpha
+        ))
+        self.p_value = min(self.p_value, p_value)
+        self.confidence_sequence = (max(self.confidence_sequence[0], lower),
+                                    min(self.confidence_sequence[1], upper))
+        look = {
+            'step': self.steps['A'],
+            'difference': difference,
+            'p_value': self.p_value,
+            'confidence_sequence': self.confidence_sequence,
+            'reject_null': self.p_value < self.alpha
+        }
+        self.history.append(look)
+        return look
+    
+    @classmethod
+    @instrumentation.timed('msprt.batch_evaluate')
+    def batch_evaluate(cls, successes_A, trials_A, successes_B, trials_B, tau=0.01, alpha=0.05):
+        # Cumulative counts with looks along the last axis (any leading shape,
+        # e.g. experiments x looks). Returns the always-valid p-values and
+        # confidence sequences at every look.
+        successes_A, trials_A, successes_B, trials_B = (
+            np.atleast_1d(v) for v in FrequentistABTest._count_arrays(successes_A, trials_A, successes_B, trials_B)
+        )
+        difference, p_value, lower, upper = cls._evaluate(successes_A, trials_A, successes_B, trials_B, tau, alpha)
+        p_value = np.minimum.accumulate(p_value, axis=-1)
+        return {
+            'difference': difference,
+            'p_value': p_value,
+            'confidence_sequence': np.stack([np.maximum.accumulate(lower, axis=-1),
+                                             np.minimum.accumulate(upper, axis=-1)], axis=-1),
+            'reject_null': p_value < alpha
+        }
 
 
 class SequentialBayesianTest:
-    def __init__(self, alpha_prior=1, beta_prior=1):
+    def __init__(self, alpha_prior=1, beta_prior=1, rng=None, half_life=None, max_history=None, window=None):
         self.alpha_prior = alpha_prior
         self.beta_prior = beta_prior
-        self.history = {'A': [], 'B': []}
+        # half_life (in batches) discounts older evidence: before each update the
+        # posterior's excess over the prior is multiplied by 0.5 ** (1 / half_life).
+        # max_history bounds the kept history; the running state is kept separately.
+        self.half_life = half_life
+        self.decay = 0.5 ** (1 / half_life) if half_life else 1.0
+        self.max_history = max_history
+        self.history = {'A': deque(maxlen=max_history), 'B': deque(maxlen=max_history)}
+        self.state = {}
+        # window keeps the last `window` batches per group in a ring buffer with
+        # running (successes, trials) sums, for "recent traffic only" posteriors
+        self.window = window
+        self.window_buckets = {}
+        self.window_sums = {}
+        self.rng = np.random.default_rng(rng)
         
     def add_observation(self, group, success, trial):
-        if not self.history[group]:
+        instrumentation.count('sequential.observations')
+        previous = self.state.get(group)
+        if previous is None:
             current_alpha = self.alpha_prior
             current_beta = self.beta_prior
         else:
-            current_alpha, current_beta = self.history[group][-1]['posterior_params']
+            current_alpha, current_beta = previous['posterior_params']
+        
+        if self.decay < 1:
+            current_alpha = self.alpha_prior + self.decay * (current_alpha - self.alpha_prior)
+            current_beta = self.beta_prior + self.decay * (current_beta - self.beta_prior)
         
         # Update with new data
         new_alpha = current_alpha + (success if success else 0)
         new_beta = current_beta + (trial - success if trial else 0)
         
         observation = {
-            'step': len(self.history[group]) + 1,
+            'step': previous['step'] + 1 if previous else 1,
             'successes': success,
             'trials': trial,
-            'cumulative_successes': (self.history[group][-1]['cumulative_successes'] + success 
-                                    if self.history[group] else success),
-            'cumulative_trials': (self.history[group][-1]['cumulative_trials'] + trial 
-                                if self.history[group] else trial),
+            'cumulative_successes': previous['cumulative_successes'] + success if previous else success,
+            'cumulative_trials': previous['cumulative_trials'] + trial if previous else trial,
             'posterior_params': (new_alpha, new_beta),
             'posterior_mean': new_alpha / (new_alpha + new_beta)
         }
         
+        self.state[group] = observation
         self.history[group].append(observation)
+        if self.window:
+            self._update_window(group, observation['step'], success, trial)
         return observation
     
-    def get_current_probability(self, n_samples=10000):
-        if not self.history['A'] or not self.history['B']:
+    @instrumentation.timed('sequential.add_observations')
+    def add_observations(self, group, successes, trials):
+        # Same result as add_observation over each batch in turn, with the
+        # posterior path computed as cumulative sums (a first-order filter
+        # when decaying) and only the kept history materialized
+        successes = np.asarray(successes, dtype=np.int64).ravel()
+        trials = np.asarray(trials, dtype=np.int64).ravel()
+        if successes.shape != trials.shape:
+            raise ValueError("successes and trials must have the same length")
+        if not len(trials):
+            return
+        instrumentation.count('sequential.observations', len(trials))
+        
+        previous = self.state.get(group)
+        if previous is None:
+            step, cumulative_successes, cumulative_trials = 0, 0, 0
+            excess_alpha, excess_beta = 0.0, 0.0
+        else:
+            step = previous['step']
+            cumulative_successes = previous['cumulative_successes']
+            cumulative_trials = previous['cumulative_trials']
+            excess_alpha = previous['posterior_params'][0] - self.alpha_prior
+            excess_beta = previous['posterior_params'][1] - self.beta_prior
+        
+        failures = trials - successes
+        if self.decay < 1:
+            from scipy.signal import lfilter
+            
+            # x_k = decay * x_{k-1} + new_k, started from the previous excess
+            filter_args = ([1.0], [1.0, -self.decay])
+            alphas = lfilter(*filter_args, successes, zi=[self.decay * excess_alpha])[0]
+            betas = lfilter(*filter_args, failures, zi=[self.decay * excess_beta])[0]
+        else:
+            alphas = excess_alpha + np.cumsum(successes)
+            betas = excess_beta + np.cumsum(failures)
+        alphas = alphas + self.alpha_prior
+        betas = betas + self.beta_prior
+        
+        kept = slice(-self.max_history, None) if self.max_history else slice(None)
+        columns = (
+            np.arange(step + 1, step + len(trials) + 1)[kept], successes[kept], trials[kept],
+            (cumulative_successes + np.cumsum(successes))[kept], (cumulative_trials + np.cumsum(trials))[kept],
+            alphas[kept], betas[kept], (alphas / (alphas + betas))[kept]
+        )
+        self.history[group].extend(
+            {
+                'step': step_k,
+                'successes': success,
+                'trials': trial,
+                'cumulative_successes': cumulative_success,
+                'cumulative_trials': cumulative_trial,
+                'posterior_params': (alpha, beta),
+                'posterior_mean': mean
+            }
+            for step_k, success, trial, cumulative_success, cumulative_trial, alpha, beta, mean
+            in zip(*(column.tolist() for column in columns))
+        )
+        self.state[group] = {
+            'step': step + len(trials),
+            'successes': int(successes[-1]),
+            'trials': int(trials[-1]),
+            'cumulative_successes': cumulative_successes + int(successes.sum()),
+            'cumulative_trials': cumulative_trials + int(trials.sum()),
+            'posterior_params': (float(alphas[-1]), float(betas[-1])),
+            'posterior_mean': float(alphas[-1] / (alphas[-1] + betas[-1]))
+        }
+        
+        if self.window:
+            if group not in self.window_buckets:
+                self.window_buckets[group] = np.zeros((self.window, 2), dtype=np.int64)
+            recent = slice(max(len(trials) - self.window, 0), None)
+            steps = np.arange(step + 1, step + len(trials) + 1)[recent]
+            self.window_buckets[group][(steps - 1) % self.window] = np.column_stack(
+                (successes[recent], trials[recent])
+            )
+            self.window_sums[group] = self.window_buckets[group].sum(axis=0)
+    
+    def history_base(self, group):
+        # (alpha, beta, cumulative successes, cumulative trials, step) just
+        # before the first kept observation, so that replaying the kept history
+        # from it reproduces truncated (max_history) and decayed tests
+        observations = self.history[group]
+        if not observations:
+            last = self.state[group]
+            return last['posterior_params'] + (last['cumulative_successes'], last['cumulative_trials'], last['step'])
+        first = observations[0]
+        alpha, beta = first['posterior_params']
+        alpha -= first['successes']
+        beta -= first['trials'] - first['successes']
+        if self.decay < 1:
+            alpha = self.alpha_prior + (alpha - self.alpha_prior) / self.decay
+            beta = self.beta_prior + (beta - self.beta_prior) / self.decay
+        return (alpha, beta, first['cumulative_successes'] - first['successes'],
+                first['cumulative_trials'] - first['trials'], first['step'] - 1)
+    
+    def restore_base(self, group, alpha, beta, cumulative_successes, cumulative_trials, step):
+        # Inverse of history_base, for an empty group about to replay its kept history
+        if step > 0:
+            self.state[group] = {
+                'step': int(step),
+                'cumulative_successes': int(cumulative_successes),
+                'cumulative_trials': int(cumulative_trials),
+                'posterior_params': (alpha, beta),
+                'posterior_mean': alpha / (alpha + beta)
+            }
+    
+    def _update_window(self, group, step, success, trial):
+        if group not in self.window_buckets:
+            self.window_buckets[group] = np.zeros((self.window, 2), dtype=np.int64)
+            self.window_sums[group] = np.zeros(2, dtype=np.int64)
+        bucket = self.window_buckets[group][(step - 1) % self.window]
+        self.window_sums[group] += (success - bucket[0], trial - bucket[1])
+        bucket[:] = (success, trial)
+    
+    def window_posterior(self, group):
+        if not self.window:
+            raise ValueError("Create the test with window=... to track a sliding window")
+        successes, trials = self.window_sums.get(group, (0, 0))
+        return self.alpha_prior + int(successes), self.beta_prior + int(trials - successes)
+    
+    def get_window_probability(self):
+        # P(B > A) over the window only, by quadrature: cost does not depend on history
+        alpha_A, beta_A = self.window_posterior('A')
+        alpha_B, beta_B = self.window_posterior('B')
+        prob_B_beats_A, _ = BayesianABTest._quadrature(
+            *(np.asarray(p, dtype=float) for p in (alpha_A, beta_A, alpha_B, beta_B))
+        )
+        return float(prob_B_beats_A)
+    
+    @instrumentation.timed('sequential.current_probability')
+    def get_current_probability(self, n_samples=10000, rng=None):
+        if 'A' not in self.state or 'B' not in self.state:
             return 0.5
         
-        params_A = self.history['A'][-1]['posterior_params']
-        params_B = self.history['B'][-1]['posterior_params']
+        params_A = self.state['A']['posterior_params']
+        params_B = self.state['B']['posterior_params']
         
-        samples_A = np.random.beta(params_A[0], params_A[1], n_samples)
-        samples_B = np.random.beta(params_B[0], params_B[1], n_samples)
+        rng = self.rng if rng is None else rng
+        samples_A = rng.beta(params_A[0], params_A[1], n_samples)
+        samples_B = rng.beta(params_B[0], params_B[1], n_samples)
         
         return np.mean(samples_B > samples_A)
     
+    @instrumentation.timed('sequential.probability_history')
+    def get_probability_history(self, n_samples=10000, rng=None, max_points=None):
+        # n_samples=None evaluates the steps by quadrature in one vectorized
+        # call instead of sampling; max_points thins long histories to evenly
+        # spaced steps (always keeping the last one)
+        pairs = list(zip(self.history['A'], self.history['B']))
+        if max_points and len(pairs) > max_points:
+            keep = np.unique(np.linspace(len(pairs) - 1, 0, max_points).round().astype(int))
+            pairs = [pairs[i] for i in keep]
+        
+        if n_samples is None:
+            if not pairs:
+                return []
+            params = np.array([obs_A['posterior_params'] + obs_B['posterior_params']
+                               for obs_A, obs_B in pairs], dtype=float)
+            probabilities, _ = BayesianABTest._quadrature(*params.T)
+            return [{'step': obs_A['step'], 'probability': probability}
+                    for (obs_A, _), probability in zip(pairs, probabilities.tolist())]
+        
+        rng = self.rng if rng is None else rng
+        probabilities = []
+        for obs_A, obs_B in pairs:
+            params_A = obs_A['posterior_params']
+            params_B = obs_B['posterior_params']
+            
+            samples_A = rng.beta(params_A[0], params_A[1], n_samples)
+            samples_B = rng.beta(params_B[0], params_B[1], n_samples)
+            
+            probabilities.append({'step': obs_A['step'], 'probability': np.mean(samples_B > samples_A)})
+        return probabilities
+    
+    @instrumentation.timed('sequential.history_df')
     def get_history_df(self):
+        import pandas as pd
+        
         records = []
         for group in ['A', 'B']:
             for obs in self.history[group]:
@@ -190,4 +1150,18 @@ class SequentialBayesianTest:
                     'cumulative_successes': obs['cumulative_successes'],
                     'posterior_mean': obs['posterior_mean']
                 })
-        return pd.DataFrame(records)
\ No newline at end of file
+        return pd.DataFrame(records)
+    
+    def save(self, path, name='default'):
+        from snapshots import save_snapshot
+        
+        save_snapshot(path, {name: self})
+    
+    @classmethod
+    def load(cls, path, name=None, rng=None):
+        from snapshots import load_snapshot
+        
+        test = load_snapshot(path, name, rng)
+        if not isinstance(test, cls):
+            raise TypeError(f"Snapshot holds a {type(test).__name__}, not a {cls.__name__}")
+        return test
\ No newline at end of file
@@ -0,0 +1,205 @@
+"""Benchmarks for the statistical hot paths.
+
+    python benchmarks/bench_hot_paths.py                   # compare with baseline.json
+    python benchmarks/bench_hot_paths.py --save-baseline   # record a new baseline
+    python benchmarks/bench_hot_paths.py --only risk       # substring filter
+
+Every case runs with the sizes in SIZES, and each test object gets its
+own Generator seeded with SEED. Wall time is the median of --repeats runs. Peak memory is measured with tracemalloc in a
+separate run, so tracing overhead does not skew the timings. A case is
+flagged when its median time or peak memory exceeds the stored baseline by
+more than --threshold.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import numpy as np  # noqa: E402
+
+from bayesian_models import BayesianABTest, SequentialBayesianTest  # noqa: E402
+from utils import (  # noqa: E402
+    calculate_bayes_factor,
+    compare_portfolio,
+    prior_grid,
+    replay_sequential,
+    simulate_scenario,
+    simulate_stopping_rule,
+)
+
+BASELINE_FILE = os.path.join(BENCH_DIR, 'baseline.json')
+SEED = 12345
+
+SIZES = {
+    'n_samples': 100000,
+    'trials': 10000,
+    'experiments': 1000,
+    'history_length': 50,
+    'simulations': 100,
+    'replay_batches': 100000,
+}
+
+
+def _bayes_test():
+    test = BayesianABTest(alpha_prior=1, beta_prior=1, rng=SEED)
+    test.update_posterior(int(SIZES['trials'] * 0.10), SIZES['trials'], 'A')
+    test.update_posterior(int(SIZES['trials'] * 0.11), SIZES['trials'], 'B')
+    return test
+
+
+def _sequential_test():
+    rng = np.random.default_rng(SEED)
+    seq_test = SequentialBayesianTest(alpha_prior=1, beta_prior=1, rng=SEED)
+    batch = SIZES['trials'] // SIZES['history_length']
+    for _ in range(SIZES['history_length']):
+        seq_test.add_observation('A', int(rng.binomial(batch, 0.10)), batch)
+        seq_test.add_observation('B', int(rng.binomial(batch, 0.11)), batch)
+    return seq_test
+
+
+def _portfolio():
+    rng = np.random.default_rng(SEED)
+    n = SIZES['experiments']
+    trials = np.full(n, SIZES['trials'])
+    return (rng.binomial(trials, 0.10), trials, rng.binomial(trials, 0.11), trials)
+
+
+def build_cases():
+    # Each case is (setup, run); only run() is timed.
+    cases = {
+        'calculate_risk': (_bayes_test, lambda test: test.calculate_risk(SIZES['n_samples'])),
+        'calculate_bayes_factor': (_bayes_test, lambda test: calculate_bayes_factor(test, SIZES['n_samples'])),
+        'batch_calculate_risk': (_portfolio, lambda counts: BayesianABTest.batch_calculate_risk(*counts)),
+        'compare_portfolio': (_portfolio, lambda counts: compare_portfolio(*counts)),
+        'prior_sensitivity': (_bayes_test, lambda test: test.prior_sensitivity(*prior_grid(
+            np.linspace(0.05, 0.2, 20), np.geomspace(2, 4 * SIZES['trials'], 20)
+        ))),
+        'design_simulation': (
+            lambda: None,
+            lambda _: simulate_scenario(0.10, 0.12, SIZES['trials'] // 10, n_sims=SIZES['simulations'])
+        ),
+        'stopping_rule_simulation': (
+            lambda: None,
+            lambda _: simulate_stopping_rule(0.10, 0.11, SIZES['trials'] // SIZES['history_length'],
+                                             SIZES['history_length'], n_reps=SIZES['experiments'] * 10)
+        ),
+        'sequential_probability_history': (_sequential_test, lambda seq: seq.get_probability_history()),
+        'sequential_replay': (
+            lambda: {'A': {'successes': SIZES['replay_batches'], 'trials': SIZES['replay_batches'] * 10},
+                     'B': {'successes': SIZES['replay_batches'], 'trials': SIZES['replay_batches'] * 10}},
+            lambda data: replay_sequential(data, SIZES['replay_batches'], rng=SEED)
+        ),
+    }
+
+    try:
+        import visualizations
+    except ImportError:
+        print("plotly not installed: skipping plot builder benchmarks", file=sys.stderr)
+        return cases
+
+    # Plot builders are timed through JSON serialization, which is what the app pays for
+    cases.update({
+        'plot_posterior_distributions': (
+            _bayes_test,
+            lambda test: visualizations.plot_posterior_distributions(test, SIZES['n_samples']).to_json()
+        ),
+        'plot_uplift_distribution': (
+            _bayes_test,
+            lambda test: visualizations.plot_uplift_distribution(test, SIZES['n_samples']).to_json()
+        ),
+        'plot_sequential_history': (
+            _sequential_test,
+            lambda seq: visualizations.plot_sequential_history(seq).to_json()
+        ),
+    })
+    return cases
+
+
+def run_case(setup, run, repeats):
+    timings = []
+    for _ in range(repeats):
+        state = setup()
+        start = time.perf_counter()
+        run(state)
+        timings.append(time.perf_counter() - start)
+
+    state = setup()
+    tracemalloc.start()
+    run(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'median_ms': statistics.median(timings) * 1000, 'min_ms': min(timings) * 1000,
+            'peak_mb': peak / 2 ** 20}
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            continue
+        for metric in ('median_ms', 'peak_mb'):
+            if previous[metric] > 0 and result[metric] > previous[metric] * threshold:
+                regressions.append(f"{name}: {metric} {previous[metric]:.2f} -> {result[metric]:.2f}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the statistical hot paths")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--only', help="Run only cases whose name contains this string")
+    parser.add_argument('--threshold', type=float, default=1.5,
+                        help="Flag cases slower or larger than baseline by this factor")
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"{'case':<32} {'median ms':>10} {'min ms':>9} {'peak MB':>9}")
+    for name, (setup, run) in build_cases().items():
+        if args.only and args.only not in name:
+            continue
+        results[name] = run_case(setup, run, args.repeats)
+        r = results[name]
+        print(f"{name:<32} {r['median_ms']:>10.2f} {r['min_ms']:>9.2f} {r['peak_mb']:>9.2f}")
+
+    if args.save_baseline:
+        baseline = {'sizes': SIZES, 'seed': SEED, 'results': results}
+        if os.path.exists(args.baseline) and args.only:
+            # Partial runs only refresh the cases they ran
+            with open(args.baseline) as f:
+                baseline['results'] = dict(json.load(f)['results'], **results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("\nNo baseline found; run with --save-baseline to create one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get('sizes') != SIZES:
+        print("\nWarning: baseline was recorded with different sizes", file=sys.stderr)
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\nRegressions (> {args.threshold:.2f}x baseline):")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"\nNo regressions (threshold {args.threshold:.2f}x)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
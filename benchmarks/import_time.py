@@ -0,0 +1,106 @@
+"""Import-time report for the numerical core.
+
+    python benchmarks/import_time.py            # table + budget check
+    python benchmarks/import_time.py --detail   # also list the slowest imports
+
+Each module is imported in a fresh interpreter. The reported cost is the
+median over several runs, minus the cost of importing numpy alone, since
+every module needs numpy anyway. The script exits non-zero when a module
+goes over its budget in import_budget.json or pulls in a heavy dependency
+that should only load on demand.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+BUDGET_FILE = os.path.join(BENCH_DIR, 'import_budget.json')
+
+_PROBE = (
+    "import json, sys, time\n"
+    "start = time.perf_counter()\n"
+    "import {module}\n"
+    "elapsed = time.perf_counter() - start\n"
+    "print(json.dumps({{'seconds': elapsed, 'modules': sorted(sys.modules)}}))\n"
+)
+
+
+def measure_import(module, repeats=5):
+    timings = []
+    loaded = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, '-c', _PROBE.format(module=module)],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output)
+        timings.append(result['seconds'] * 1000)
+        loaded = result['modules']
+    return statistics.median(timings), loaded
+
+
+def slowest_imports(module, top=10):
+    # Parses the cumulative column of `python -X importtime`
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line.split('|')
+        rows.append((int(cumulative_us) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure import time of the core modules")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--detail', action='store_true', help="Show the slowest transitive imports")
+    parser.add_argument('--json', dest='json_output', help="Also write the report to this file")
+    args = parser.parse_args(argv)
+
+    with open(BUDGET_FILE) as f:
+        config = json.load(f)
+
+    reference_ms, _ = measure_import(config['reference_module'], args.repeats)
+    print(f"{config['reference_module']} baseline: {reference_ms:.1f} ms\n")
+    print(f"{'module':<20} {'total ms':>9} {'own ms':>8} {'budget':>7}  status")
+
+    report = {'reference_ms': reference_ms, 'modules': {}}
+    failed = False
+    for module, budget in config['budgets_ms'].items():
+        total_ms, loaded = measure_import(module, args.repeats)
+        own_ms = max(total_ms - reference_ms, 0.0)
+        forbidden = [name for name in config['forbidden_modules'].get(module, []) if name in loaded]
+
+        status = 'ok'
+        if own_ms > budget:
+            status = 'OVER BUDGET'
+        if forbidden:
+            status = f"loads {', '.join(forbidden)}"
+        failed = failed or status != 'ok'
+
+        print(f"{module:<20} {total_ms:>9.1f} {own_ms:>8.1f} {budget:>7}  {status}")
+        report['modules'][module] = {
+            'total_ms': total_ms, 'own_ms': own_ms, 'budget_ms': budget, 'forbidden_loaded': forbidden
+        }
+
+        if args.detail:
+            for cumulative_ms, name in slowest_imports(module):
+                print(f"    {cumulative_ms:>8.1f} ms  {name}")
+
+    if args.json_output:
+        with open(args.json_output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
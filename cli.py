@@ -0,0 +1,203 @@
+"""Headless batch runner: python cli.py experiments.json -o results.json
+
+Reads experiment definitions from JSON or CSV and never imports Streamlit
+or Plotly, so it can be scheduled from cron.
+
+JSON input is a list of experiments (or {"experiments": [...]}):
+
+    {"name": "checkout", "successes_A": 100, "trials_A": 1000,
+     "successes_B": 120, "trials_B": 1000,
+     "alpha_prior": 1, "beta_prior": 1,
+     "batches": [[10, 100, 12, 100], ...]}
+
+"metric": "count" switches to the Gamma-Poisson model, with
+events_A/exposure_A/events_B/exposure_B instead of successes/trials.
+"batches" is optional; each row is [successes_A, trials_A, successes_B,
+trials_B] for one sequential look. CSV input has one experiment per row
+with the same column names (without batches).
+"""
+import argparse
+import csv
+import json
+import math
+import sys
+import time
+
+import numpy as np
+
+from bayesian_models import (
+    BayesianABTest,
+    FrequentistABTest,
+    GammaPoissonABTest,
+    SequentialBayesianTest,
+)
+from utils import RandomStreams, calculate_bayes_factor
+
+CSV_COLUMNS = [
+    'name', 'metric',
+    'probability_B_beats_A', 'expected_uplift', 'uplift_ci_low', 'uplift_ci_high',
+    'expected_loss_choose_A', 'expected_loss_choose_B', 'recommended_choice',
+    'bayes_factor', 'chi2_p_value', 'z_p_value', 'sequential_probability', 'sequential_steps',
+    'error'
+]
+
+
+def _to_builtin(value):
+    # JSON has no Infinity/NaN (e.g. expected uplift of a count metric when
+    # alpha_A <= 1), so non-finite numbers are written as null
+    if isinstance(value, dict):
+        return {k: _to_builtin(v) for k, v in value.items()}
+    if isinstance(value, np.ndarray):
+        return _to_builtin(value.tolist())
+    if isinstance(value, (list, tuple)):
+        return [_to_builtin(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def load_experiments(path):
+    if str(path).endswith('.csv'):
+        with open(path, newline='') as f:
+            experiments = []
+            for row in csv.DictReader(f):
+                experiments.append({k: _parse_number(v) for k, v in row.items() if v != ''})
+            return experiments
+
+    with open(path) as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data['experiments']
+    return data
+
+
+def _parse_number(value):
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+def analyze_experiment(experiment, n_samples=100000, rng=None):
+    alpha_prior = experiment.get('alpha_prior', 1)
+    beta_prior = experiment.get('beta_prior', 1)
+    metric = experiment.get('metric', 'binomial')
+    result = {'name': experiment.get('name'), 'metric': metric}
+
+    if metric == 'count':
+        test = GammaPoissonABTest(alpha_prior=alpha_prior, beta_prior=beta_prior, rng=rng)
+        test.update_posterior(experiment['events_A'], experiment['exposure_A'], 'A')
+        test.update_posterior(experiment['events_B'], experiment['exposure_B'], 'B')
+        result['risk_metrics'] = test.calculate_risk()
+        return result
+
+    successes_A, trials_A = experiment['successes_A'], experiment['trials_A']
+    successes_B, trials_B = experiment['successes_B'], experiment['trials_B']
+
+    test = BayesianABTest(alpha_prior=alpha_prior, beta_prior=beta_prior, rng=rng)
+    test.update_posterior(successes_A, trials_A, 'A')
+    test.update_posterior(successes_B, trials_B, 'B')
+    result['risk_metrics'] = test.calculate_risk(n_samples)
+    result['bayes_factor'] = calculate_bayes_factor(test, n_samples)
+
+    # Closed forms, so scoring doesn't pay for importing scipy.stats and statsmodels
+    result['chi_squared'] = FrequentistABTest.batch_chi_squared_test(successes_A, trials_A, successes_B, trials_B)
+    result['proportion_test'] = FrequentistABTest.batch_proportion_test(successes_A, trials_A, successes_B, trials_B)
+
+    if experiment.get('batches'):
+        seq_test = SequentialBayesianTest(alpha_prior=alpha_prior, beta_prior=beta_prior, rng=rng)
+        for batch_successes_A, batch_trials_A, batch_successes_B, batch_trials_B in experiment['batches']:
+            seq_test.add_observation('A', batch_successes_A, batch_trials_A)
+            seq_test.add_observation('B', batch_successes_B, batch_trials_B)
+        result['sequential'] = {
+            'steps': len(seq_test.history['A']),
+            'probability_B_beats_A': seq_test.get_current_probability(),
+            # Built from the history directly so the runner doesn't need pandas
+            'history': [
+                {'group': group, 'step': obs['step'], 'cumulative_trials': obs['cumulative_trials'],
+                 'cumulative_successes': obs['cumulative_successes'], 'posterior_mean': obs['posterior_mean']}
+                for group in ['A', 'B'] for obs in seq_test.history[group]
+            ]
+        }
+
+    return result
+
+
+def run_experiments(experiments, n_samples=100000, seed=None):
+    # One stream per experiment, so results don't depend on file order
+    streams = RandomStreams(seed).spawn(len(experiments))
+    results = []
+    for experiment, rng in zip(experiments, streams):
+        try:
+            results.append(analyze_experiment(experiment, n_samples, rng))
+        except (KeyError, TypeError, ValueError, ZeroDivisionError) as exc:
+            results.append({'name': experiment.get('name'), 'error': f"{type(exc).__name__}: {exc}"})
+    return results
+
+
+def _flatten(result):
+    risk = result.get('risk_metrics', {})
+    uplift_ci = risk.get('uplift_ci', [None, None])
+    return {
+        'name': result.get('name'),
+        'metric': result.get('metric'),
+        'probability_B_beats_A': risk.get('probability_B_beats_A'),
+        'expected_uplift': risk.get('expected_uplift'),
+        'uplift_ci_low': uplift_ci[0],
+        'uplift_ci_high': uplift_ci[1],
+        'expected_loss_choose_A': risk.get('expected_loss_choose_A'),
+        'expected_loss_choose_B': risk.get('expected_loss_choose_B'),
+        'recommended_choice': risk.get('recommended_choice'),
+        'bayes_factor': result.get('bayes_factor', {}).get('bayes_factor'),
+        'chi2_p_value': result.get('chi_squared', {}).get('p_value'),
+        'z_p_value': result.get('proportion_test', {}).get('p_value'),
+        'sequential_probability': result.get('sequential', {}).get('probability_B_beats_A'),
+        'sequential_steps': result.get('sequential', {}).get('steps'),
+        'error': result.get('error')
+    }
+
+
+def write_results(results, output, fmt):
+    results = _to_builtin(results)
+    if fmt == 'csv':
+        writer = csv.DictWriter(output, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        for result in results:
+            writer.writerow(_flatten(result))
+    else:
+        json.dump(results, output, indent=2)
+        output.write('\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score A/B experiments without the Streamlit UI")
+    parser.add_argument('experiments', help="Experiment definitions (.json or .csv)")
+    parser.add_argument('-o', '--output', help="Output file (defaults to stdout)")
+    parser.add_argument('-f', '--format', choices=['json', 'csv'],
+                        help="Output format (inferred from --output, default json)")
+    parser.add_argument('--n-samples', type=int, default=100000, help="Posterior samples per experiment")
+    parser.add_argument('--seed', type=int, help="Seed for reproducible Monte Carlo estimates")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ('csv' if args.output and args.output.endswith('.csv') else 'json')
+    start = time.perf_counter()
+    results = run_experiments(load_experiments(args.experiments), args.n_samples, args.seed)
+
+    if args.output:
+        with open(args.output, 'w', newline='') as f:
+            write_results(results, f, fmt)
+    else:
+        write_results(results, sys.stdout, fmt)
+
+    n_errors = sum(1 for result in results if result.get('error'))
+    print(f"Scored {len(results)} experiments in {time.perf_counter() - start:.2f}s "
+          f"({n_errors} errors)", file=sys.stderr)
+    return 1 if n_errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
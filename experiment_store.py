@@ -0,0 +1,339 @@
+"""SQLite-backed persistence for experiments and sequential history.
+
+    store = ExperimentStore('experiments.db')
+    store.create_experiment('checkout', alpha_prior=1, beta_prior=1)
+    store.append('checkout', 'A', successes=12, trials=100)
+    store.latest_posterior('checkout')      # one indexed lookup, no replay
+    store.load_sequential_test('checkout')  # full history when it is needed
+
+Observations are buffered and written in batches, one transaction per
+flush. Each flush also bumps the running totals per group (decayed by the
+experiment's half_life, if it has one), so the latest posterior is read
+directly instead of being summed from the history.
+"""
+import json
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from bayesian_models import BayesianABTest, SequentialBayesianTest
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS experiments (
+    name TEXT PRIMARY KEY,
+    alpha_prior REAL NOT NULL,
+    beta_prior REAL NOT NULL,
+    half_life REAL,
+    window INTEGER,
+    max_history INTEGER,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    results TEXT
+);
+CREATE TABLE IF NOT EXISTS group_totals (
+    experiment TEXT NOT NULL,
+    group_name TEXT NOT NULL,
+    steps INTEGER NOT NULL,
+    successes INTEGER NOT NULL,
+    trials INTEGER NOT NULL,
+    decayed_successes REAL NOT NULL,
+    decayed_failures REAL NOT NULL,
+    PRIMARY KEY (experiment, group_name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS group_base (
+    experiment TEXT NOT NULL,
+    group_name TEXT NOT NULL,
+    step INTEGER NOT NULL,
+    successes INTEGER NOT NULL,
+    trials INTEGER NOT NULL,
+    alpha REAL NOT NULL,
+    beta REAL NOT NULL,
+    PRIMARY KEY (experiment, group_name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS observations (
+    experiment TEXT NOT NULL,
+    group_name TEXT NOT NULL,
+    step INTEGER NOT NULL,
+    successes INTEGER NOT NULL,
+    trials INTEGER NOT NULL,
+    PRIMARY KEY (experiment, group_name, step)
+) WITHOUT ROWID;
+"""
+
+
+def _encode(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot store {type(value).__name__} in experiment results")
+
+
+def _decode(value):
+    # Numeric lists come back as arrays, matching what the models return
+    if isinstance(value, dict):
+        return {key: _decode(item) for key, item in value.items()}
+    if isinstance(value, list) and value and all(isinstance(item, (int, float)) for item in value):
+        return np.asarray(value)
+    return value
+
+
+class ExperimentStore:
+    def __init__(self, path='experiments.db', batch_size=1000):
+        self.path = path
+        self.batch_size = batch_size
+        # One connection shared across threads (e.g. app sessions), guarded by a lock
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.RLock()
+        self.pending = []
+        self.steps = {}
+        self.decays = {}
+        with self.lock, self.connection:
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.executescript(SCHEMA)
+            columns = {row[1] for row in self.connection.execute('PRAGMA table_info(experiments)')}
+            if 'max_history' not in columns:
+                self.connection.execute('ALTER TABLE experiments ADD COLUMN max_history INTEGER')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def close(self):
+        with self.lock:
+            self.flush()
+            self.connection.close()
+
+    def experiments(self):
+        with self.lock:
+            rows = self.connection.execute('SELECT name FROM experiments ORDER BY updated_at DESC')
+            return [name for (name,) in rows]
+
+    def has_experiment(self, name):
+        with self.lock:
+            row = self.connection.execute('SELECT 1 FROM experiments WHERE name = ?', (name,)).fetchone()
+            return row is not None
+
+    def create_experiment(self, name, alpha_prior=1, beta_prior=1, half_life=None, window=None, replace=False,
+                          max_history=None):
+        with self.lock:
+            if replace:
+                self.delete_experiment(name)
+            now = time.time()
+            with self.connection:
+                self.connection.execute(
+                    'INSERT OR IGNORE INTO experiments '
+                    '(name, alpha_prior, beta_prior, half_life, window, max_history, created_at, updated_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (name, float(alpha_prior), float(beta_prior), half_life, window, max_history, now, now)
+                )
+
+    def delete_experiment(self, name):
+        with self.lock:
+            self.pending = [row for row in self.pending if row[0] != name]
+            self.steps = {key: steps for key, steps in self.steps.items() if key[0] != name}
+            self.decays.pop(name, None)
+            with self.connection:
+                for table, column in [('observations', 'experiment'), ('group_totals', 'experiment'),
+                                      ('group_base', 'experiment'), ('experiments', 'name')]:
+                    self.connection.execute(f'DELETE FROM {table} WHERE {column} = ?', (name,))
+
+    def _next_step(self, name, group_name):
+        key = (name, group_name)
+        if key not in self.steps:
+            row = self.connection.execute(
+                'SELECT steps FROM group_totals WHERE experiment = ? AND group_name = ?', key
+            ).fetchone()
+            self.steps[key] = row[0] if row else 0
+        self.steps[key] += 1
+        return self.steps[key]
+
+    def _decay(self, name):
+        if name not in self.decays:
+            row = self.connection.execute('SELECT half_life FROM experiments WHERE name = ?', (name,)).fetchone()
+            half_life = row[0] if row else None
+            self.decays[name] = 0.5 ** (1 / half_life) if half_life else 1.0
+        return self.decays[name]
+
+    def append(self, name, group_name, successes, trials):
+        with self.lock:
+            step = self._next_step(name, group_name)
+            self.pending.append((name, group_name, step, int(successes), int(trials)))
+            if len(self.pending) >= self.batch_size:
+                self.flush()
+            return step
+
+    def append_many(self, name, group_name, successes, trials):
+        with self.lock:
+            key = (name, group_name)
+            first = self._next_step(name, group_name)
+            self.steps[key] += len(trials) - 1
+            self.pending.extend(
+                (name, group_name, step, success, trial)
+                for step, success, trial in zip(range(first, first + len(trials)),
+                                                np.asarray(successes, dtype=np.int64).tolist(),
+                                                np.asarray(trials, dtype=np.int64).tolist())
+            )
+            if len(self.pending) >= self.batch_size:
+                self.flush()
+            return self.steps[key]
+
+    def flush(self):
+        with self.lock:
+            if not self.pending:
+                return 0
+            rows, self.pending = self.pending, []
+            totals = {}
+            for name, group_name, _, successes, trials in rows:
+                decay = self._decay(name)
+                steps, total_successes, total_trials, decayed_successes, decayed_failures = totals.get(
+                    (name, group_name), (0, 0, 0, 0.0, 0.0)
+                )
+                totals[(name, group_name)] = (
+                    steps + 1, total_successes + successes, total_trials + trials,
+                    decayed_successes * decay + successes, decayed_failures * decay + trials - successes
+                )
+
+            with self.connection:
+                self.connection.executemany('INSERT INTO observations VALUES (?, ?, ?, ?, ?)', rows)
+                # Stored decayed sums are discounted once per new step in the batch
+                self.connection.executemany(
+                    'INSERT INTO group_totals VALUES (?, ?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT (experiment, group_name) DO UPDATE SET '
+                    'steps = steps + excluded.steps, successes = successes + excluded.successes, '
+                    'trials = trials + excluded.trials, '
+                    'decayed_successes = decayed_successes * ? + excluded.decayed_successes, '
+                    'decayed_failures = decayed_failures * ? + excluded.decayed_failures',
+                    [key + value + (self._decay(key[0]) ** value[0],) * 2 for key, value in totals.items()]
+                )
+                self.connection.executemany(
+                    'UPDATE experiments SET updated_at = ? WHERE name = ?',
+                    [(time.time(), name) for name in {name for name, _ in totals}]
+                )
+            return len(rows)
+
+    def _priors(self, name):
+        row = self.connection.execute(
+            'SELECT alpha_prior, beta_prior FROM experiments WHERE name = ?', (name,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"Unknown experiment {name!r}")
+        return row
+
+    def latest_posterior(self, name):
+        with self.lock:
+            self.flush()
+            alpha_prior, beta_prior = self._priors(name)
+            rows = self.connection.execute(
+                'SELECT group_name, steps, successes, trials, decayed_successes, decayed_failures '
+                'FROM group_totals WHERE experiment = ?', (name,)
+            )
+            return {
+                group_name: {
+                    'alpha': alpha_prior + decayed_successes,
+                    'beta': beta_prior + decayed_failures,
+                    'successes': successes,
+                    'trials': trials,
+                    'steps': steps
+                }
+                for group_name, steps, successes, trials, decayed_successes, decayed_failures in rows
+            }
+
+    def history(self, name, group_name):
+        # (step, successes, trials) arrays in step order
+        with self.lock:
+            self.flush()
+            rows = self.connection.execute(
+                'SELECT step, successes, trials FROM observations '
+                'WHERE experiment = ? AND group_name = ? ORDER BY step',
+                (name, group_name)
+            ).fetchall()
+        return np.array(rows, dtype=np.int64).reshape(-1, 3)
+
+    def save_bayesian_test(self, name, test):
+        # Totals only: one observation per group
+        with self.lock:
+            self.create_experiment(name, test.alpha_prior, test.beta_prior, replace=True)
+            for group_name, posterior in test.results.items():
+                self.append(name, group_name, posterior['successes'], posterior['trials'])
+            self.flush()
+
+    def load_bayesian_test(self, name, rng=None):
+        with self.lock:
+            alpha_prior, beta_prior = self._priors(name)
+            posterior = self.latest_posterior(name)
+        test = BayesianABTest(alpha_prior=alpha_prior, beta_prior=beta_prior, rng=rng)
+        for group_name, totals in posterior.items():
+            test.update_posterior(totals['successes'], totals['trials'], group_name)
+        return test
+
+    def save_sequential_test(self, name, seq_test):
+        # With max_history, evidence older than the kept history is stored as
+        # a base state per group; group totals start from it, so steps and the
+        # latest posterior continue where the test left off
+        bases = {group_name: seq_test.history_base(group_name) for group_name in seq_test.state}
+        for group_name, (_, _, _, _, step) in bases.items():
+            if step > 0 and seq_test.window and seq_test.window > len(seq_test.history[group_name]):
+                raise ValueError(
+                    f"Cannot save {name!r}: its window of {seq_test.window} batches reaches past the "
+                    f"{len(seq_test.history[group_name])} kept in its history (max_history)"
+                )
+
+        with self.lock:
+            self.create_experiment(name, seq_test.alpha_prior, seq_test.beta_prior, seq_test.half_life,
+                                   seq_test.window, replace=True, max_history=seq_test.max_history)
+            with self.connection:
+                for group_name, (alpha, beta, successes, trials, step) in bases.items():
+                    if step > 0:
+                        self.connection.execute(
+                            'INSERT INTO group_base VALUES (?, ?, ?, ?, ?, ?, ?)',
+                            (name, group_name, step, successes, trials, alpha, beta)
+                        )
+                        self.connection.execute(
+                            'INSERT INTO group_totals VALUES (?, ?, ?, ?, ?, ?, ?)',
+                            (name, group_name, step, successes, trials,
+                             alpha - seq_test.alpha_prior, beta - seq_test.beta_prior)
+                        )
+            for group_name, observations in seq_test.history.items():
+                if observations:
+                    self.append_many(name, group_name, [obs['successes'] for obs in observations],
+                                     [obs['trials'] for obs in observations])
+            self.flush()
+
+    def load_sequential_test(self, name, rng=None):
+        with self.lock:
+            alpha_prior, beta_prior = self._priors(name)
+            half_life, window, max_history = self.connection.execute(
+                'SELECT half_life, window, max_history FROM experiments WHERE name = ?', (name,)
+            ).fetchone()
+            bases = self.connection.execute(
+                'SELECT group_name, alpha, beta, successes, trials, step FROM group_base WHERE experiment = ?',
+                (name,)
+            ).fetchall()
+            histories = {group_name: self.history(name, group_name) for group_name in ('A', 'B')}
+        seq_test = SequentialBayesianTest(alpha_prior=alpha_prior, beta_prior=beta_prior, rng=rng,
+                                          half_life=half_life, max_history=max_history, window=window)
+        for group_name, *base in bases:
+            seq_test.restore_base(group_name, *base)
+        for group_name, rows in histories.items():
+            seq_test.add_observations(group_name, rows[:, 1], rows[:, 2])
+        return seq_test
+
+    def save_results(self, name, results):
+        payload = json.dumps(results, default=_encode)
+        with self.lock, self.connection:
+            self.connection.execute(
+                'UPDATE experiments SET results = ?, updated_at = ? WHERE name = ?', (payload, time.time(), name)
+            )
+
+    def load_results(self, name):
+        with self.lock:
+            row = self.connection.execute('SELECT results FROM experiments WHERE name = ?', (name,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return _decode(json.loads(row[0]))
@@ -0,0 +1,216 @@
+"""Group-sequential efficacy and futility boundaries from spending functions.
+
+    boundaries = compute_boundaries(n_looks=5, alpha=0.025, beta=0.2,
+                                    spending='obrien_fleming')
+    boundaries['efficacy_z']      # reject H0 at look k if Z_k >= this
+    boundaries['futility_z']      # stop for futility if Z_k <= this
+
+One-sided tests of "B better than A" with Lan-DeMets spending. Efficacy
+boundaries are computed under H0 and do not depend on the futility
+boundaries (non-binding futility). Futility boundaries spend beta under
+the alternative whose drift makes the last two boundaries meet. Crossing
+probabilities use the recursive numerical integration of Armitage,
+McPherson and Rowe on a Simpson grid.
+
+Results are memoized in memory and in JSON files under
+$AB_BOUNDARY_CACHE (default ~/.cache/bayesian-ab-testing), because a
+design with many looks takes long enough to notice on every rerun.
+"""
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+
+SPENDING_FUNCTIONS = ('obrien_fleming', 'pocock')
+CACHE_VERSION = 1
+GRID_POINTS = 401
+
+
+def cache_dir():
+    return os.environ.get('AB_BOUNDARY_CACHE',
+                          os.path.join(os.path.expanduser('~'), '.cache', 'bayesian-ab-testing'))
+
+
+def spent(kind, t, total):
+    from scipy import special
+
+    t = np.asarray(t, dtype=float)
+    if kind == 'obrien_fleming':
+        return 2 * special.ndtr(-special.ndtri(1 - total / 2) / np.sqrt(t))
+    if kind == 'pocock':
+        return total * np.log1p((np.e - 1) * t)
+    raise ValueError(f"spending must be one of {SPENDING_FUNCTIONS}")
+
+
+def _simpson_grid(lower, upper, n=GRID_POINTS):
+    grid = np.linspace(lower, upper, n)
+    weights = np.ones(n)
+    weights[1:-1:2] = 4
+    weights[2:-1:2] = 2
+    return grid, weights * (upper - lower) / (3 * (n - 1))
+
+
+class _Recursion:
+    # Sub-density of the score statistic S_k ~ N(drift * t_k, t_k) over the
+    # continuation region, carried from look to look
+    def __init__(self, information, drift):
+        from scipy import special
+
+        self.special = special
+        self.information = information
+        self.drift = drift
+        self.grid = None
+        self.mass = None
+
+    def _increment(self, k):
+        previous = self.information[k - 1] if k else 0.0
+        delta = self.information[k] - previous
+        return self.drift * delta, np.sqrt(delta)
+
+    def cross_upper(self, k, z):
+        bound = z * np.sqrt(self.information[k])
+        mean, sd = self._increment(k)
+        if self.grid is None:
+            return self.special.ndtr((mean - bound) / sd)
+        return float(self.mass @ self.special.ndtr((self.grid + mean - bound) / sd))
+
+    def cross_lower(self, k, z):
+        bound = z * np.sqrt(self.information[k])
+        mean, sd = self._increment(k)
+        if self.grid is None:
+            return self.special.ndtr((bound - mean) / sd)
+        return float(self.mass @ self.special.ndtr((bound - self.grid - mean) / sd))
+
+    def advance(self, k, lower_z, upper_z):
+        root = np.sqrt(self.information[k])
+        centre = self.drift * self.information[k]
+        # Truncate the continuation region where the density is negligible
+        lower = max(lower_z * root, centre - 8 * root)
+        upper = max(min(upper_z * root, centre + 8 * root), lower)
+        grid, weights = _simpson_grid(lower, upper)
+        mean, sd = self._increment(k)
+        if self.grid is None:
+            density = np.exp(-0.5 * ((grid - mean) / sd) ** 2) / (sd * np.sqrt(2 * np.pi))
+        else:
+            kernel = np.exp(-0.5 * ((grid[:, None] - self.grid[None, :] - mean) / sd) ** 2) / (sd * np.sqrt(2 * np.pi))
+            density = kernel @ self.mass
+        self.grid = grid
+        self.mass = weights * density
+
+
+def _solve(function, lower=-20.0, upper=40.0):
+    from scipy.optimize import brentq
+
+    return brentq(function, lower, upper, xtol=1e-10)
+
+
+def _efficacy_boundaries(information, alpha, kind):
+    increments = np.diff(spent(kind, information, alpha), prepend=0.0)
+    recursion = _Recursion(information, 0.0)
+    boundaries = []
+    for k, target in enumerate(increments):
+        z = _solve(lambda z: recursion.cross_upper(k, z) - target)
+        boundaries.append(z)
+        recursion.advance(k, -np.inf, z)
+    return boundaries
+
+
+def _futility_boundaries(information, efficacy, beta, kind, drift):
+    increments = np.diff(spent(kind, information, beta), prepend=0.0)
+    recursion = _Recursion(information, drift)
+    boundaries = []
+    last = len(information) - 1
+    for k, target in enumerate(increments):
+        # Boundaries meet once the continuation region cannot spend the
+        # increment; the last look is left unclipped so the drift can be solved
+        upper = 40.0 if k == last else efficacy[k]
+        if recursion.cross_lower(k, upper) <= target:
+            z = upper
+        else:
+            z = _solve(lambda z: recursion.cross_lower(k, z) - target, upper=upper)
+        if k < last:
+            recursion.advance(k, z, efficacy[k])
+        boundaries.append(z)
+    return boundaries
+
+
+def _power(information, efficacy, drift):
+    recursion = _Recursion(information, drift)
+    power = 0.0
+    for k, z in enumerate(efficacy):
+        power += recursion.cross_upper(k, z)
+        recursion.advance(k, -np.inf, z)
+    return power
+
+
+@lru_cache(maxsize=128)
+def _cached_boundaries(information, alpha, beta, kind, futility):
+    key = json.dumps([CACHE_VERSION, information, alpha, beta, kind, futility])
+    path = os.path.join(cache_dir(), f"boundaries-{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json")
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    from scipy import special
+
+    information_array = np.asarray(information)
+    efficacy = _efficacy_boundaries(information_array, alpha, kind)
+    fixed_drift = special.ndtri(1 - alpha) + special.ndtri(1 - beta)
+
+    if futility:
+        # The alternative is the drift at which the final boundaries meet
+        drift = _solve(
+            lambda d: _futility_boundaries(information_array, efficacy, beta, kind, d)[-1] - efficacy[-1],
+            0.5 * fixed_drift, 3 * fixed_drift
+        )
+        futility_z = _futility_boundaries(information_array, efficacy, beta, kind, drift)
+        futility_z[-1] = efficacy[-1]
+    else:
+        drift = _solve(lambda d: _power(information_array, efficacy, d) - (1 - beta),
+                       0.5 * fixed_drift, 3 * fixed_drift)
+        futility_z = None
+
+    result = {
+        'information': list(information),
+        'efficacy_z': efficacy,
+        'futility_z': futility_z,
+        'alpha_spent': spent(kind, information_array, alpha).tolist(),
+        'beta_spent': spent(kind, information_array, beta).tolist() if futility else None,
+        'drift': drift,
+        # Maximum sample size relative to the fixed-horizon design
+        'inflation_factor': (drift / fixed_drift) ** 2
+    }
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(result, f)
+    except OSError:
+        pass
+    return result
+
+
+def compute_boundaries(n_looks=5, alpha=0.025, beta=0.2, spending='obrien_fleming', futility=True,
+                       information=None):
+    # information: cumulative information fractions of the looks (ending at
+    # 1); equally spaced looks when omitted
+    if spending not in SPENDING_FUNCTIONS:
+        raise ValueError(f"spending must be one of {SPENDING_FUNCTIONS}")
+    if information is None:
+        information = np.arange(1, n_looks + 1) / n_looks
+    information = tuple(round(float(t), 12) for t in information)
+    if any(b <= a for a, b in zip((0.0,) + information, information)) or information[-1] != 1.0:
+        raise ValueError("information fractions must increase to 1")
+
+    from scipy import special
+
+    result = _cached_boundaries(information, float(alpha), float(beta), spending, bool(futility))
+    boundaries = {key: np.array(value) if isinstance(value, list) else value for key, value in result.items()}
+    boundaries['spending'] = spending
+    boundaries['efficacy_probability'] = special.ndtr(boundaries['efficacy_z'])
+    boundaries['futility_probability'] = (special.ndtr(boundaries['futility_z'])
+                                          if futility else None)
+    return boundaries
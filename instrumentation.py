@@ -0,0 +1,108 @@
+"""Lightweight timers and counters for the analysis pipeline.
+
+Disabled by default. While disabled, timer() returns a shared no-op
+context manager and count() returns immediately, so the hooks in the
+models, utilities and plot builders cost a function call each.
+
+    import instrumentation
+    instrumentation.enable()
+    ...
+    instrumentation.snapshot()
+
+State is process-wide, so concurrent app sessions report into the same
+registry.
+"""
+import threading
+import time
+from functools import wraps
+
+_enabled = False
+_lock = threading.Lock()
+_timers = {}
+_counters = {}
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        with _lock:
+            stats = _timers.setdefault(self.name, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] = max(stats[2], elapsed)
+        return False
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+
+
+def timer(name):
+    return _Timer(name) if _enabled else _NULL_TIMER
+
+
+def count(name, n=1):
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def timed(name):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Timer(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def snapshot():
+    with _lock:
+        timers = {
+            name: {
+                'calls': calls,
+                'total_ms': total * 1000,
+                'mean_ms': total / calls * 1000,
+                'max_ms': longest * 1000
+            }
+            for name, (calls, total, longest) in _timers.items()
+        }
+        return {'enabled': _enabled, 'timers': timers, 'counters': dict(_counters)}
@@ -0,0 +1,151 @@
+"""Background jobs with progress, partial results and cancellation.
+
+    manager = JobManager(max_workers=2)
+    job = manager.submit(simulate_scenario, 0.10, 0.12, 1000, n_sims=1000)
+    job.progress        # 0..1 as reported by the function
+    job.partial         # latest partial result, if the function reports one
+    job.cancel()        # stops the job at its next progress report
+    job.result()        # blocks; re-raises whatever the function raised
+
+Functions opt in to progress and cancellation by accepting a `progress`
+keyword argument: a callable progress(fraction, partial=None) that raises
+JobCancelled once the job has been cancelled. Functions without it still
+run in the background, but can only be cancelled before they start.
+
+Jobs run on a thread pool. The numerical work is numpy/scipy code that
+releases the GIL, so the submitting thread (e.g. a Streamlit script)
+stays responsive, and progress and partial results are shared without
+any pickling.
+"""
+import inspect
+import itertools
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, job_id, name):
+        self.id = job_id
+        self.name = name
+        self.progress = 0.0
+        self.partial = None
+        self.submitted_at = time.time()
+        self.finished_at = None
+        self.future = None
+        self._cancelled = threading.Event()
+
+    def report(self, fraction, partial=None):
+        if self._cancelled.is_set():
+            raise JobCancelled(self.name)
+        self.progress = min(max(float(fraction), 0.0), 1.0)
+        if partial is not None:
+            self.partial = partial
+
+    def cancel(self):
+        self._cancelled.set()
+        # Pending jobs never start; running ones stop at their next report
+        self.future.cancel()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def done(self):
+        return self.future.done()
+
+    @property
+    def status(self):
+        if self.future.cancelled():
+            return 'cancelled'
+        if not self.future.done():
+            return 'cancelling' if self.cancelled else ('running' if self.future.running() else 'pending')
+        error = self.future.exception()
+        if isinstance(error, JobCancelled):
+            return 'cancelled'
+        return 'failed' if error is not None else 'done'
+
+    @property
+    def elapsed(self):
+        return (self.finished_at or time.time()) - self.submitted_at
+
+    def result(self, timeout=None):
+        try:
+            return self.future.result(timeout)
+        except CancelledError:
+            raise JobCancelled(self.name) from None
+
+    def error(self):
+        if not self.future.done() or self.future.cancelled():
+            return None
+        error = self.future.exception()
+        return None if isinstance(error, JobCancelled) else error
+
+
+class JobManager:
+    def __init__(self, max_workers=2, keep_finished=50):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ab-job')
+        self.keep_finished = keep_finished
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        return False
+
+    def submit(self, fn, *args, name=None, **kwargs):
+        job = Job(next(self._ids), name or getattr(fn, '__name__', 'job'))
+        if _accepts_progress(fn):
+            kwargs['progress'] = job.report
+
+        def run():
+            job.report(0.0)
+            try:
+                result = fn(*args, **kwargs)
+            finally:
+                job.finished_at = time.time()
+            job.progress = 1.0
+            return result
+
+        with self.lock:
+            job.future = self.executor.submit(run)
+            self.jobs[job.id] = job
+            self._prune()
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def active(self):
+        with self.lock:
+            return [job for job in self.jobs.values() if not job.done()]
+
+    def cancel_all(self):
+        for job in self.active():
+            job.cancel()
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.done()]
+        for job_id in finished[:max(len(finished) - self.keep_finished, 0)]:
+            del self.jobs[job_id]
+
+    def shutdown(self, wait=True):
+        self.cancel_all()
+        self.executor.shutdown(wait=wait)
+
+
+def _accepts_progress(fn):
+    try:
+        parameters = inspect.signature(fn).parameters
+    except (TypeError, ValueError):
+        return False
+    return 'progress' in parameters
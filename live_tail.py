@@ -0,0 +1,131 @@
+"""Follow a growing CSV event log and keep a sequential test current.
+
+    tailer = EventLogTailer('events.csv', group_col='group', outcome_col='converted')
+    update = tailer.poll()          # ingests only the bytes appended since the last poll
+    update['probability_B_beats_A']
+    tailer.seq_test                 # one batch per group per poll that saw new rows
+
+The log is the same shape aggregation.py reads: a header line, then one
+row per event with a variant column ('A' or 'B') and a 0/1 or true/false
+outcome (pandas writes boolean columns as True/False). Each
+poll reads from the remembered byte offset up to the last complete line,
+so a row that is still being written is picked up by the next poll. If the
+file shrinks or is replaced (log rotation), reading restarts at the top of
+the new file and the posterior carries on.
+"""
+import csv
+import io
+import os
+
+import numpy as np
+
+from bayesian_models import BayesianABTest, SequentialBayesianTest
+from sufficient_stats import BinomialStats
+
+GROUPS = ('A', 'B')
+BOOLEAN_OUTCOMES = {'true': True, 'false': False}
+
+
+def _outcome(value):
+    boolean = BOOLEAN_OUTCOMES.get(value.strip().lower())
+    return float(value) != 0 if boolean is None else boolean
+
+
+class EventLogTailer:
+    def __init__(self, path, group_col='group', outcome_col='converted', seq_test=None,
+                 alpha_prior=1, beta_prior=1, max_bytes=64 * 2 ** 20, **seq_kwargs):
+        # max_bytes caps a single poll, so a large backlog is ingested over
+        # several refreshes instead of one long one
+        self.path = path
+        self.group_col = group_col
+        self.outcome_col = outcome_col
+        self.max_bytes = max_bytes
+        self.seq_test = seq_test if seq_test is not None else SequentialBayesianTest(
+            alpha_prior=alpha_prior, beta_prior=beta_prior, **seq_kwargs
+        )
+        self.offset = 0
+        self.inode = None
+        self.columns = None
+        self.rows = 0
+        self.skipped = 0
+        self.polls = 0
+
+    def _reset_if_rotated(self):
+        stat = os.stat(self.path)
+        if self.inode is not None and (stat.st_ino != self.inode or stat.st_size < self.offset):
+            self.offset = 0
+            self.columns = None
+        self.inode = stat.st_ino
+        return stat.st_size
+
+    def _read_new_lines(self):
+        size = self._reset_if_rotated()
+        if size <= self.offset:
+            return b''
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            chunk = f.read(min(size - self.offset, self.max_bytes))
+        end = chunk.rfind(b'\n') + 1
+        if end == 0 and len(chunk) == self.max_bytes:
+            raise ValueError(f"Line at byte {self.offset} of {self.path} is longer than max_bytes")
+        self.offset += end
+        return chunk[:end]
+
+    def _parse(self, lines):
+        reader = csv.reader(io.StringIO(lines.decode('utf-8')))
+        if self.columns is None:
+            header = next(reader, None)
+            if header is None:
+                return {}
+            try:
+                self.columns = (header.index(self.group_col), header.index(self.outcome_col))
+            except ValueError:
+                raise ValueError(
+                    f"{self.path} has no {self.group_col!r} and {self.outcome_col!r} columns"
+                ) from None
+
+        group_index, outcome_index = self.columns
+        counts = {group: [0, 0] for group in GROUPS}
+        for row in reader:
+            try:
+                group = row[group_index]
+                success = _outcome(row[outcome_index])
+            except (IndexError, ValueError):
+                self.skipped += 1
+                continue
+            if group not in counts:
+                self.skipped += 1
+                continue
+            counts[group][0] += success
+            counts[group][1] += 1
+        return {group: BinomialStats(*count) for group, count in counts.items()}
+
+    def poll(self):
+        # Cost is proportional to the bytes appended since the last poll
+        lines = self._read_new_lines()
+        batch = self._parse(lines)
+        new_rows = sum(stats.trials for stats in batch.values())
+        if new_rows:
+            # Both groups get a (possibly empty) batch so their steps stay aligned
+            for group in GROUPS:
+                batch[group].add_to_sequential(self.seq_test, group)
+            self.rows += new_rows
+        self.polls += 1
+        return {
+            'new_rows': new_rows,
+            'new_bytes': len(lines),
+            'batch': {group: stats.to_dict() for group, stats in batch.items()} if new_rows else {},
+            'probability_B_beats_A': self.probability_B_beats_A(),
+            'rows': self.rows,
+            'skipped': self.skipped,
+            'offset': self.offset
+        }
+
+    def probability_B_beats_A(self):
+        # Quadrature on the current posteriors: constant cost however long the log gets
+        state = self.seq_test.state
+        if 'A' not in state or 'B' not in state:
+            return 0.5
+        params = state['A']['posterior_params'] + state['B']['posterior_params']
+        probability, _ = BayesianABTest._quadrature(*(np.asarray(p, dtype=float) for p in params))
+        return float(probability)
@@ -0,0 +1,251 @@
+"""Asyncio HTTP scoring service: python service.py --port 8000
+
+Standard library only (plus numpy/scipy for the models).
+
+    POST /score    {"successes_A": 100, "trials_A": 1000,
+                    "successes_B": 120, "trials_B": 1000,
+                    "alpha_prior": 1, "beta_prior": 1}
+                   or {"experiments": [...]} for several at once
+    GET  /metrics  latency percentiles, batch sizes and cache counters
+    GET  /health
+
+Concurrent requests that arrive within window_ms of each other are
+scored together with one BayesianABTest.batch_calculate_risk call, and
+results are cached by sufficient statistics.
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+
+import instrumentation
+from bayesian_models import BayesianABTest
+
+SCORE_FIELDS = ('successes_A', 'trials_A', 'successes_B', 'trials_B')
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           500: 'Internal Server Error'}
+
+
+def experiment_key(experiment):
+    try:
+        counts = tuple(int(experiment[field]) for field in SCORE_FIELDS)
+    except KeyError as exc:
+        raise ValueError(f"Missing field {exc.args[0]!r}") from None
+    if counts[0] > counts[1] or counts[2] > counts[3] or min(counts) < 0:
+        raise ValueError("Successes must be between 0 and trials")
+    return counts + (float(experiment.get('alpha_prior', 1)), float(experiment.get('beta_prior', 1)))
+
+
+def _json_float(value):
+    # JSON has no Infinity/NaN (JSON.parse rejects them), e.g. the expected
+    # uplift is infinite when alpha_A <= 1
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+def score_keys(keys):
+    successes_A, trials_A, successes_B, trials_B, alpha_prior, beta_prior = np.array(keys, dtype=float).T
+    risk = BayesianABTest.batch_calculate_risk(
+        successes_A, trials_A, successes_B, trials_B, alpha_prior, beta_prior
+    )
+    results = []
+    for i in range(len(keys)):
+        results.append({
+            'probability_B_beats_A': _json_float(risk['probability_B_beats_A'][i]),
+            'probability_A_beats_B': _json_float(risk['probability_A_beats_B'][i]),
+            'expected_uplift': _json_float(risk['expected_uplift'][i]),
+            'uplift_ci': [_json_float(v) for v in risk['uplift_ci'][i]],
+            'expected_loss_choose_A': _json_float(risk['expected_loss_choose_A'][i]),
+            'expected_loss_choose_B': _json_float(risk['expected_loss_choose_B'][i]),
+            'recommended_choice': str(risk['recommended_choice'][i])
+        })
+    return results
+
+
+class LatencyTracker:
+    def __init__(self, maxlen=10000):
+        self.samples = deque(maxlen=maxlen)
+
+    def record(self, seconds):
+        self.samples.append(seconds * 1000)
+
+    def summary(self):
+        if not self.samples:
+            return {'count': 0}
+        p50, p90, p99 = np.percentile(self.samples, [50, 90, 99])
+        return {'count': len(self.samples), 'p50_ms': p50, 'p90_ms': p90, 'p99_ms': p99,
+                'max_ms': max(self.samples)}
+
+
+class BatchCoalescer:
+    def __init__(self, window_ms=2.0, max_batch=2048, cache_size=100000):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.pending = {}
+        self.flush_handle = None
+        self.counters = {'cache_hits': 0, 'cache_misses': 0, 'batches': 0, 'scored': 0}
+        self.batch_sizes = deque(maxlen=1000)
+
+    async def score(self, key):
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.counters['cache_hits'] += 1
+            instrumentation.count('service.cache_hits')
+            return self.cache[key]
+        self.counters['cache_misses'] += 1
+        instrumentation.count('service.cache_misses')
+
+        # Identical in-flight requests share one future
+        future = self.pending.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self.pending[key] = future
+            if len(self.pending) >= self.max_batch:
+                self._flush()
+            elif self.flush_handle is None:
+                self.flush_handle = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        batch, self.pending = self.pending, {}
+        if batch:
+            asyncio.ensure_future(self._run_batch(batch))
+
+    async def _run_batch(self, batch):
+        keys = list(batch)
+        self.counters['batches'] += 1
+        self.counters['scored'] += len(keys)
+        self.batch_sizes.append(len(keys))
+        try:
+            # Vectorized scoring runs off the event loop so new requests keep queueing
+            results = await asyncio.get_running_loop().run_in_executor(None, score_keys, keys)
+        except Exception as exc:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for key, result in zip(keys, results):
+            self.cache[key] = result
+            future = batch[key]
+            if not future.done():
+                future.set_result(result)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def stats(self):
+        sizes = list(self.batch_sizes)
+        return dict(self.counters, cache_entries=len(self.cache),
+                    mean_batch_size=float(np.mean(sizes)) if sizes else 0.0,
+                    max_batch_size=max(sizes, default=0))
+
+
+class ScoringService:
+    def __init__(self, window_ms=2.0, max_batch=2048, cache_size=100000):
+        self.coalescer = BatchCoalescer(window_ms, max_batch, cache_size)
+        self.latency = LatencyTracker()
+        self.server = None
+
+    async def handle_score(self, payload):
+        if isinstance(payload, dict) and 'experiments' in payload:
+            keys = [experiment_key(experiment) for experiment in payload['experiments']]
+            return {'results': await asyncio.gather(*(self.coalescer.score(key) for key in keys))}
+        return await self.coalescer.score(experiment_key(payload))
+
+    def metrics(self):
+        return {'latency': self.latency.summary(), 'coalescer': self.coalescer.stats()}
+
+    async def dispatch(self, method, path, body):
+        if path == '/health':
+            return 200, {'status': 'ok'}
+        if path == '/metrics':
+            return 200, self.metrics()
+        if path != '/score':
+            return 404, {'error': f"Unknown path {path}"}
+        if method != 'POST':
+            return 405, {'error': "Use POST for /score"}
+
+        start = time.perf_counter()
+        try:
+            result = await self.handle_score(json.loads(body or b'{}'))
+        except (ValueError, TypeError) as exc:
+            return 400, {'error': str(exc)}
+        self.latency.record(time.perf_counter() - start)
+        return 200, result
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length', 0))
+                body = await reader.readexactly(length) if length else b''
+                try:
+                    status, payload = await self.dispatch(method, path.split('?', 1)[0], body)
+                except Exception as exc:
+                    status, payload = 500, {'error': f"{type(exc).__name__}: {exc}"}
+
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                data = json.dumps(payload).encode('utf-8')
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=8000):
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server
+
+    async def serve_forever(self, host='127.0.0.1', port=8000):
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve P(B > A) and expected loss over HTTP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--window-ms', type=float, default=2.0, help="Coalescing window")
+    parser.add_argument('--max-batch', type=int, default=2048)
+    parser.add_argument('--cache-size', type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    service = ScoringService(args.window_ms, args.max_batch, args.cache_size)
+    print(f"Scoring service listening on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(service.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+import numpy as np
+
+# Largest finite float: log ratios of draws that underflow to 0 are clipped to it
+_FLOAT_MAX = np.finfo(float).max
+
+
+def _to_log_ratio(percent):
+    # Percentage change -> log of the ratio, clipped so that -100% stays finite
+    return np.clip(np.log1p(np.asarray(percent, dtype=float) / 100), -_FLOAT_MAX, _FLOAT_MAX)
+
+
+def _from_log_ratio(log_ratio):
+    return np.expm1(log_ratio) * 100
+
+
+SCALES = {
+    'linear': (None, None),
+    # For relative uplift in percent, i.e. 100 * (B / A - 1): bins are even in
+    # log(B / A), so a right-skewed ratio of small rates keeps both tails resolved
+    'log_ratio': (_to_log_ratio, _from_log_ratio),
+}
+
+
+class HistogramSketch:
+    # Fixed-size streaming histogram for quantiles, means and exceedance
+    # probabilities of posterior draws. The bin range is taken from the inner
+    # quantiles of the first chunk (padded on both sides), so a heavy tail such
+    # as the relative uplift of a near-zero rate does not stretch every bin.
+    # Values outside it are counted in underflow/overflow, together with the
+    # exact min and max. With scale='log_ratio', values are binned (and low,
+    # high, edges, minimum and maximum kept) on the log-ratio scale; quantiles,
+    # thresholds and histograms are in the original units.
+    def __init__(self, n_bins=8192, low=None, high=None, padding=0.25, tail=0.001, scale='linear'):
+        if scale not in SCALES:
+            raise ValueError(f"Unknown scale {scale!r}")
+        self.n_bins = n_bins
+        self.padding = padding
+        self.tail = tail
+        self.scale = scale
+        self.low = low
+        self.high = high
+        self.counts = np.zeros(n_bins, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+        self.count = 0
+        self.total = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+
+    @property
+    def edges(self):
+        return np.linspace(self.low, self.high, self.n_bins + 1)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else np.nan
+
+    def _forward(self, values):
+        forward = SCALES[self.scale][0]
+        return values if forward is None else forward(values)
+
+    def _inverse(self, values):
+        inverse = SCALES[self.scale][1]
+        return values if inverse is None else inverse(values)
+
+    def update(self, values):
+        values = np.asarray(values).ravel()
+        mask = np.isfinite(values)
+        finite = values if mask.all() else values[mask]
+        if finite.size == 0:
+            return self
+        self.total += float(finite.sum(dtype=np.float64))
+        finite = self._forward(finite)
+
+        if self.low is None:
+            low, high = np.quantile(finite, [self.tail, 1 - self.tail]).tolist()
+            span = (high - low) or max(abs(low), 1.0) * 1e-6
+            self.low = low - self.padding * span
+            self.high = high + self.padding * span
+
+        self.count += finite.size
+        self.minimum = min(self.minimum, float(finite.min()))
+        self.maximum = max(self.maximum, float(finite.max()))
+
+        scale = self.n_bins / (self.high - self.low)
+        index = np.floor((finite - self.low) * scale).astype(np.int64)
+        index[finite == self.high] = self.n_bins - 1
+        below = index < 0
+        above = index >= self.n_bins
+        self.underflow += int(np.count_nonzero(below))
+        self.overflow += int(np.count_nonzero(above))
+        inside = index[~(below | above)]
+        self.counts += np.bincount(inside, minlength=self.n_bins)
+        return self
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        if self.low is None:
+            self.low, self.high = other.low, other.high
+        if (self.low, self.high, self.n_bins, self.scale) != (other.low, other.high, other.n_bins, other.scale):
+            raise ValueError("Can only merge sketches with identical bins")
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        self.count += other.count
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        return self
+
+    def _cumulative(self):
+        # Cumulative counts at each bin edge, with underflow before the first edge
+        return self.underflow + np.concatenate([[0], np.cumsum(self.counts)])
+
+    def _cdf_points(self):
+        # (value, cumulative count) knots: the bin edges, extended to the exact
+        # extremes so underflow/overflow are spread between them and the range
+        edges = np.concatenate([[min(self.minimum, self.low)], self.edges, [max(self.maximum, self.high)]])
+        cumulative = np.concatenate([[0], self._cumulative(), [self.count]])
+        return edges, cumulative
+
+    def quantile(self, q):
+        q = np.asarray(q, dtype=float)
+        if self.count == 0:
+            return np.full(q.shape, np.nan)
+        edges, cumulative = self._cdf_points()
+        values = np.interp(q * self.count, cumulative, edges)
+        # Never report values outside what was actually observed
+        return self._inverse(np.clip(values, self.minimum, self.maximum))
+
+    def percentile(self, q):
+        return self.quantile(np.asarray(q, dtype=float) / 100)
+
+    def probability_greater(self, threshold):
+        if self.count == 0:
+            return np.nan
+        threshold = float(self._forward(threshold))
+        if threshold < self.minimum:
+            return 1.0
+        if threshold >= self.maximum:
+            return 0.0
+        edges, cumulative = self._cdf_points()
+        return float(1 - np.interp(threshold, edges, cumulative) / self.count)
+
+    def to_histogram(self, n_bins=50):
+        # Coarse (edges, counts) over the populated range, for plotting
+        populated = np.flatnonzero(self.counts)
+        if populated.size == 0:
+            return self._inverse(np.array([self.minimum, self.maximum])), np.array([self.count])
+        first, last = populated[0], populated[-1] + 1
+        splits = np.linspace(first, last, min(n_bins, last - first) + 1).round().astype(int)
+        counts = np.add.reduceat(self.counts, splits[:-1])
+        counts[0] += self.underflow
+        counts[-1] += self.overflow
+        return self._inverse(self.edges[splits]), counts
+
+    def to_summary(self, n_bins=50, n_quantiles=201):
+        # Compact, plain-array representation (a few KB) for caching and plotting
+        edges, counts = self.to_histogram(n_bins)
+        levels = np.linspace(0, 1, n_quantiles)
+        return {
+            'edges': edges,
+            'counts': counts,
+            'quantile_levels': levels,
+            'quantiles': self.quantile(levels),
+            'count': self.count,
+            'mean': self.mean
+        }
+
+
+def summary_probability_greater(summary, threshold):
+    # Exceedance probability from the quantile table of HistogramSketch.to_summary
+    quantiles = summary['quantiles']
+    return float(1 - np.interp(threshold, quantiles, summary['quantile_levels'], left=0.0, right=1.0))
@@ -0,0 +1,238 @@
+"""Compact binary snapshots of BayesianABTest and SequentialBayesianTest.
+
+    save_snapshot('tests.absnap', {'checkout': test, 'signup': seq_test})
+    reader = SnapshotReader('tests.absnap')
+    reader.latest_posterior('checkout')   # a binary search and two rows
+    reader.load('signup')                 # full object
+
+Layout: 8-byte magic, uint32 format version, uint64 header length, a small
+JSON header with the dtype, shape and offset of every column, then the raw
+little-endian columns, each aligned to 64 bytes. Columns are memory-mapped
+on first use, so reading one experiment touches only its own rows.
+
+Experiments are stored sorted by name:
+    name_bytes     uint8   utf-8 names, concatenated
+    name_offsets   int64   (n_experiments + 1,) into name_bytes
+    kinds          uint8   (n_experiments,) index into header 'kinds'
+    priors         float64 (n_experiments, 2) alpha_prior, beta_prior
+    settings       float64 (n_experiments, 3) half_life, max_history, window
+                                              (NaN if unset)
+    group_offsets  int64   (n_experiments + 1,) rows of latest per experiment
+    groups         uint16  (n_rows,) index into header 'group_names'
+    latest         float64 (n_rows, 4) alpha, beta, successes, trials
+    base           float64 (n_rows, 5) alpha, beta, cumulative successes and
+                                       trials, step before the first kept
+                                       observation (sequential tests only)
+    obs_offsets    int64   (n_rows + 1,) rows of observations per group
+    observations   int64   (n_obs, 2) successes, trials per sequential step
+    window_offsets int64   (n_rows + 1,) rows of window_buckets per group
+    window_buckets int64   (n_buckets, 2) sliding-window ring buffer as stored
+"""
+import json
+import struct
+
+import numpy as np
+
+from bayesian_models import BayesianABTest, SequentialBayesianTest
+
+MAGIC = b'ABSNAP\x00\x00'
+SNAPSHOT_VERSION = 1
+ALIGNMENT = 64
+KINDS = ['bayesian', 'sequential']
+_PREAMBLE = struct.Struct('<8sIQ')
+
+
+def _aligned(n):
+    return -(-n // ALIGNMENT) * ALIGNMENT
+
+
+def _test_rows(test):
+    # -> kind, settings, [(group_name, latest, base, observations, window buckets)]
+    if isinstance(test, SequentialBayesianTest):
+        rows = []
+        for group_name, last in test.state.items():
+            latest = last['posterior_params'] + (last['cumulative_successes'], last['cumulative_trials'])
+            observations = [(obs['successes'], obs['trials']) for obs in test.history[group_name]]
+            buckets = test.window_buckets.get(group_name, np.empty((0, 2))).tolist()
+            rows.append((group_name, latest, test.history_base(group_name), observations, buckets))
+        settings = tuple(np.nan if value is None else value
+                         for value in (test.half_life, test.max_history, test.window))
+        return 'sequential', settings, rows
+    if isinstance(test, BayesianABTest):
+        return 'bayesian', (np.nan,) * 3, [
+            (group_name, (p['alpha'], p['beta'], p['successes'], p['trials']), (0,) * 5, [], [])
+            for group_name, p in test.results.items()
+        ]
+    raise TypeError(f"Cannot snapshot {type(test).__name__}")
+
+
+def save_snapshot(path, tests):
+    # tests maps experiment name -> test object
+    names = sorted(tests, key=lambda name: name.encode('utf-8'))
+    encoded = [name.encode('utf-8') for name in names]
+    group_names = []
+    kinds, priors, settings, group_offsets = [], [], [], [0]
+    groups, latest, base, obs_offsets, observations = [], [], [], [0], []
+    window_offsets, window_buckets = [0], []
+
+    for name in names:
+        test = tests[name]
+        kind, test_settings, rows = _test_rows(test)
+        kinds.append(KINDS.index(kind))
+        priors.append((test.alpha_prior, test.beta_prior))
+        settings.append(test_settings)
+        for group_name, latest_row, base_row, group_observations, buckets in rows:
+            if group_name not in group_names:
+                group_names.append(group_name)
+            groups.append(group_names.index(group_name))
+            latest.append(latest_row)
+            base.append(base_row)
+            observations.extend(group_observations)
+            obs_offsets.append(len(observations))
+            window_buckets.extend(buckets)
+            window_offsets.append(len(window_buckets))
+        group_offsets.append(len(latest))
+
+    columns = {
+        'name_bytes': np.frombuffer(b''.join(encoded), dtype='u1'),
+        'name_offsets': np.cumsum([0] + [len(name) for name in encoded], dtype='<i8'),
+        'kinds': np.array(kinds, dtype='u1'),
+        'priors': np.array(priors, dtype='<f8').reshape(-1, 2),
+        'settings': np.array(settings, dtype='<f8').reshape(-1, 3),
+        'group_offsets': np.array(group_offsets, dtype='<i8'),
+        'groups': np.array(groups, dtype='<u2'),
+        'latest': np.array(latest, dtype='<f8').reshape(-1, 4),
+        'base': np.array(base, dtype='<f8').reshape(-1, 5),
+        'obs_offsets': np.array(obs_offsets, dtype='<i8'),
+        'observations': np.array(observations, dtype='<i8').reshape(-1, 2),
+        'window_offsets': np.array(window_offsets, dtype='<i8'),
+        'window_buckets': np.array(window_buckets, dtype='<i8').reshape(-1, 2)
+    }
+
+    layout = {}
+    offset = 0
+    for column, array in columns.items():
+        layout[column] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset += _aligned(array.nbytes)
+
+    header = json.dumps({'kinds': KINDS, 'group_names': group_names, 'columns': layout}).encode('utf-8')
+    # Column offsets are relative to the first aligned position after the header
+    data_start = _aligned(_PREAMBLE.size + len(header))
+
+    with open(path, 'wb') as f:
+        f.write(_PREAMBLE.pack(MAGIC, SNAPSHOT_VERSION, len(header)))
+        f.write(header)
+        for column, array in columns.items():
+            f.seek(data_start + layout[column]['offset'])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+
+
+class SnapshotReader:
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            magic, version, header_length = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a test snapshot")
+            if version > SNAPSHOT_VERSION:
+                raise ValueError(f"Snapshot version {version} is newer than supported ({SNAPSHOT_VERSION})")
+            header = json.loads(f.read(header_length))
+        self.version = version
+        self.kinds = header['kinds']
+        self.group_names = header['group_names']
+        self.layout = header['columns']
+        self.data_start = _aligned(_PREAMBLE.size + header_length)
+        self._columns = {}
+
+    def __len__(self):
+        return len(self.column('kinds'))
+
+    def column(self, name):
+        if name not in self._columns:
+            spec = self.layout[name]
+            shape = tuple(spec['shape'])
+            if 0 in shape:
+                self._columns[name] = np.empty(shape, dtype=spec['dtype'])
+            else:
+                self._columns[name] = np.memmap(self.path, dtype=spec['dtype'], mode='r',
+                                                offset=self.data_start + spec['offset'], shape=shape)
+        return self._columns[name]
+
+    def _name(self, index):
+        offsets = self.column('name_offsets')
+        return self.column('name_bytes')[offsets[index]:offsets[index + 1]].tobytes()
+
+    def names(self):
+        return [self._name(i).decode('utf-8') for i in range(len(self))]
+
+    def index(self, name):
+        # Binary search over the sorted names; reads O(log n) of them
+        target = name.encode('utf-8')
+        low, high = 0, len(self)
+        while low < high:
+            mid = (low + high) // 2
+            if self._name(mid) < target:
+                low = mid + 1
+            else:
+                high = mid
+        if low == len(self) or self._name(low) != target:
+            raise KeyError(f"Unknown experiment {name!r}")
+        return low
+
+    def _group_rows(self, index):
+        offsets = self.column('group_offsets')
+        return range(int(offsets[index]), int(offsets[index + 1]))
+
+    def latest_posterior(self, name):
+        rows = self._group_rows(self.index(name))
+        groups = self.column('groups')
+        latest = self.column('latest')
+        posterior = {}
+        for row in rows:
+            alpha, beta, successes, trials = latest[row].tolist()
+            posterior[self.group_names[groups[row]]] = {
+                'alpha': alpha, 'beta': beta, 'successes': int(successes), 'trials': int(trials)
+            }
+        return posterior
+
+    def load(self, name, rng=None):
+        index = self.index(name)
+        alpha_prior, beta_prior = self.column('priors')[index].tolist()
+        if self.kinds[self.column('kinds')[index]] == 'bayesian':
+            test = BayesianABTest(alpha_prior, beta_prior, rng=rng)
+            for group_name, posterior in self.latest_posterior(name).items():
+                test.update_posterior(posterior['successes'], posterior['trials'], group_name)
+            return test
+
+        half_life, max_history, window = (None if np.isnan(value) else value
+                                          for value in self.column('settings')[index].tolist())
+        seq_test = SequentialBayesianTest(alpha_prior, beta_prior, rng=rng, half_life=half_life,
+                                          max_history=None if max_history is None else int(max_history),
+                                          window=None if window is None else int(window))
+        groups = self.column('groups')
+        base = self.column('base')
+        obs_offsets = self.column('obs_offsets')
+        observations = self.column('observations')
+        window_offsets = self.column('window_offsets')
+        window_buckets = self.column('window_buckets')
+        for row in self._group_rows(index):
+            group_name = self.group_names[groups[row]]
+            seq_test.restore_base(group_name, *base[row].tolist())
+            group_observations = np.asarray(observations[obs_offsets[row]:obs_offsets[row + 1]])
+            seq_test.add_observations(group_name, group_observations[:, 0], group_observations[:, 1])
+            if seq_test.window:
+                # The saved ring buffer also covers batches older than the kept history
+                start, stop = window_offsets[row], window_offsets[row + 1]
+                seq_test.window_buckets[group_name] = np.array(window_buckets[start:stop])
+                seq_test.window_sums[group_name] = seq_test.window_buckets[group_name].sum(axis=0)
+        return seq_test
+
+
+def load_snapshot(path, name=None, rng=None):
+    reader = SnapshotReader(path)
+    if name is None:
+        if len(reader) != 1:
+            raise ValueError("Snapshot holds several experiments; pass name")
+        name = reader.names()[0]
+    return reader.load(name, rng=rng)
@@ -0,0 +1,196 @@
+import struct
+
+import numpy as np
+
+
+class _SufficientStats:
+    def __add__(self, other):
+        if isinstance(other, int) and other == 0:
+            # Lets sum() start from its default 0
+            return self
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.merge(other)
+
+    __radd__ = __add__
+
+    def __eq__(self, other):
+        return type(other) is type(self) and self._fields() == other._fields()
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ', '.join(f"{k}={v!r}" for k, v in self.to_dict().items() if k != 'kind')
+        return f"{type(self).__name__}({fields})"
+
+    def to_bytes(self):
+        return self._tag + struct.pack(self._format, *self._fields())
+
+
+class BinomialStats(_SufficientStats):
+    kind = 'binomial'
+    _tag = b'B'
+    _format = '<qq'
+
+    def __init__(self, successes=0, trials=0):
+        self.successes = int(successes)
+        self.trials = int(trials)
+
+    @classmethod
+    def from_values(cls, values):
+        values = np.asarray(values)
+        return cls(np.count_nonzero(values), values.size)
+
+    def merge(self, other):
+        return BinomialStats(self.successes + other.successes, self.trials + other.trials)
+
+    def _fields(self):
+        return (self.successes, self.trials)
+
+    def to_dict(self):
+        return {'kind': self.kind, 'successes': self.successes, 'trials': self.trials}
+
+    def update_test(self, test, group_name):
+        return test.update_posterior(self.successes, self.trials, group_name)
+
+    def add_to_sequential(self, sequential_test, group):
+        return sequential_test.add_observation(group, self.successes, self.trials)
+
+
+class CountStats(_SufficientStats):
+    kind = 'count'
+    _tag = b'C'
+    _format = '<qd'
+
+    def __init__(self, events=0, exposure=0.0):
+        self.events = int(events)
+        self.exposure = float(exposure)
+
+    @classmethod
+    def from_values(cls, values, exposure=None):
+        values = np.asarray(values)
+        return cls(values.sum(), values.size if exposure is None else np.sum(exposure))
+
+    def merge(self, other):
+        return CountStats(self.events + other.events, self.exposure + other.exposure)
+
+    def _fields(self):
+        return (self.events, self.exposure)
+
+    def to_dict(self):
+        return {'kind': self.kind, 'events': self.events, 'exposure': self.exposure}
+
+    def update_test(self, test, group_name):
+        return test.update_posterior(self.events, self.exposure, group_name)
+
+
+class ContinuousStats(_SufficientStats):
+    kind = 'continuous'
+    _tag = b'N'
+    _format = '<qdd'
+
+    def __init__(self, n=0, mean=0.0, m2=0.0):
+        # m2 is the sum of squared deviations from the mean (Welford / Chan et al.)
+        self.n = int(n)
+        self.mean = float(mean)
+        self.m2 = float(m2)
+
+    @classmethod
+    def from_values(cls, values):
+        values = np.asarray(values, dtype=float)
+        if values.size == 0:
+            return cls()
+        mean = values.mean()
+        return cls(values.size, mean, np.sum((values - mean) ** 2))
+
+    @property
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    def merge(self, other):
+        n = self.n + other.n
+        if n == 0:
+            return ContinuousStats()
+        delta = other.mean - self.mean
+        mean = self.mean + delta * other.n / n
+        m2 = self.m2 + other.m2 + delta ** 2 * self.n * other.n / n
+        return ContinuousStats(n, mean, m2)
+
+    def _fields(self):
+        return (self.n, self.mean, self.m2)
+
+    def to_dict(self):
+        return {'kind': self.kind, 'n': self.n, 'mean': self.mean, 'm2': self.m2}
+
+
+STATS_TYPES = {cls.kind: cls for cls in (BinomialStats, CountStats, ContinuousStats)}
+_TYPES_BY_TAG = {cls._tag: cls for cls in STATS_TYPES.values()}
+
+
+def stats_from_dict(data):
+    fields = {k: v for k, v in data.items() if k != 'kind'}
+    return STATS_TYPES[data['kind']](**fields)
+
+
+def stats_from_bytes(payload):
+    cls = _TYPES_BY_TAG[bytes(payload[:1])]
+    return cls(*struct.unpack(cls._format, payload[1:]))
+
+
+def reduce_stats(items):
+    # Pairwise (tree) reduction: same result as a left fold, but with
+    # log-depth and better floating point behaviour for continuous stats.
+    items = list(items)
+    if not items:
+        raise ValueError("Cannot reduce an empty sequence of statistics")
+    while len(items) > 1:
+        paired = [items[i].merge(items[i + 1]) for i in range(0, len(items) - 1, 2)]
+        if len(items) % 2:
+            paired.append(items[-1])
+        items = paired
+    return items[0]
+
+
+def merge_stats_maps(*maps):
+    # Merges {key: stats} mappings, e.g. keyed by variant or (variant, segment)
+    merged = {}
+    for stats_map in maps:
+        for key, value in stats_map.items():
+            merged[key] = merged[key].merge(value) if key in merged else value
+    return merged
+
+
+def stats_map_to_bytes(stats_map):
+    # Compact framing for shipping keyed statistics between workers:
+    # [n][key length][key utf-8][payload length][payload]...
+    # Key parts are stored as strings; tuple keys are joined with the ASCII unit separator.
+    chunks = [struct.pack('<I', len(stats_map))]
+    for key, value in stats_map.items():
+        parts = key if isinstance(key, tuple) else (key,)
+        encoded_key = '\x1f'.join(str(part) for part in parts).encode('utf-8')
+        payload = value.to_bytes()
+        chunks.append(struct.pack('<H', len(encoded_key)) + encoded_key)
+        chunks.append(struct.pack('<B', len(payload)) + payload)
+    return b''.join(chunks)
+
+
+def stats_map_from_bytes(blob):
+    view = memoryview(blob)
+    (n,) = struct.unpack_from('<I', view, 0)
+    offset = 4
+    stats_map = {}
+    for _ in range(n):
+        (key_len,) = struct.unpack_from('<H', view, offset)
+        offset += 2
+        parts = bytes(view[offset:offset + key_len]).decode('utf-8').split('\x1f')
+        offset += key_len
+        (payload_len,) = struct.unpack_from('<B', view, offset)
+        offset += 1
+        key = parts[0] if len(parts) == 1 else tuple(parts)
+        stats_map[key] = stats_from_bytes(view[offset:offset + payload_len])
+        offset += payload_len
+    return stats_map
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+from scipy import integrate, stats
+
+from bayesian_models import BayesianABTest, FrequentistABTest, MultiMetricExperiment
+
+
+def exact_probability_B_beats_A(alpha_A, beta_A, alpha_B, beta_B):
+    # P(A < B) = E[F_A(B)], integrated over B's quantiles
+    return integrate.quad(
+        lambda u: stats.beta.cdf(stats.beta.ppf(u, alpha_B, beta_B), alpha_A, beta_A), 0, 1, limit=1000
+    )[0]
+
+
+def monte_carlo_loss_choose_B(alpha_A, beta_A, alpha_B, beta_B, n_samples=2000000):
+    rng = np.random.default_rng(0)
+    samples_A = rng.beta(alpha_A, beta_A, n_samples)
+    samples_B = rng.beta(alpha_B, beta_B, n_samples)
+    return np.maximum(samples_A - samples_B, 0).mean()
+
+
+QUADRATURE_CASES = [
+    # (successes_A, trials_A, successes_B, trials_B, alpha_prior, beta_prior)
+    (50000, 500000, 115, 1000, 1, 1),      # A much narrower than B
+    (500000, 5000000, 30, 250, 1, 1),
+    (115, 1000, 50000, 500000, 1, 1),      # B much narrower than A
+    (0, 20, 0, 20, 0.1, 1.9),              # shapes below 1
+    (1, 20, 0, 20, 0.1, 1.9),
+    (1, 20, 0, 20, 1, 1),
+    (100, 1000, 120, 1000, 1, 1),
+    (0, 0, 0, 0, 1, 1),
+]
+
+
+@pytest.mark.parametrize('counts', QUADRATURE_CASES)
+def test_quadrature_matches_exact_probability_and_loss(counts):
+    params = BayesianABTest._posterior_arrays(*counts)
+    probability, loss_choose_B = BayesianABTest._quadrature(*params)
+    assert probability == pytest.approx(exact_probability_B_beats_A(*params), abs=1e-4)
+    assert loss_choose_B == pytest.approx(monte_carlo_loss_choose_B(*params), rel=0.02, abs=1e-5)
+
+
+def test_quadrature_decision_does_not_cross_threshold():
+    risk = BayesianABTest.batch_calculate_risk(50000, 500000, 115, 1000)
+    assert float(risk['probability_B_beats_A']) < 0.95
+
+
+def test_quadrature_broadcasts():
+    alpha_A = np.array([[2.0, 3.0], [4.0, 5.0]])
+    probability, loss = BayesianABTest._quadrature(alpha_A, np.array([10.0, 20.0]), np.array([0.5]),
+                                                   np.array([[9.0], [8.0]]))
+    assert probability.shape == loss.shape == (2, 2)
+    assert probability[0, 0] == pytest.approx(exact_probability_B_beats_A(2.0, 10.0, 0.5, 9.0), abs=1e-4)
+
+
+@pytest.mark.filterwarnings('error')
+def test_batch_frequentist_tests_handle_zero_trials_quietly():
+    proportion = FrequentistABTest.batch_proportion_test([0, 10], [0, 100], [0, 12], [0, 100])
+    chi_squared = FrequentistABTest.batch_chi_squared_test([0, 10], [0, 100], [0, 12], [0, 100])
+    assert np.isnan(proportion['p_value'][0]) and np.isnan(chi_squared['p_value'][0])
+    assert proportion['p_value'][1] == pytest.approx(FrequentistABTest.proportion_test(10, 100, 12, 100)['p_value'])
+
+
+@pytest.mark.parametrize('counts', [(0, 10, 1, 10), (0, 5, 0, 5), (5, 5, 0, 5), (1000, 10000, 1100, 10000)])
+def test_multi_metric_uplift_ci_matches_exact_percentiles(counts):
+    successes_A, trials_A, successes_B, trials_B = counts
+    experiment = MultiMetricExperiment(rng=1)
+    experiment.add_metric('conversion')
+    experiment.update_posterior('conversion', successes_A, trials_A, 'A')
+    experiment.update_posterior('conversion', successes_B, trials_B, 'B')
+    result = experiment.evaluate(200000, chunk_size=20000)['metrics']['conversion']
+
+    rng = np.random.default_rng(0)
+    samples_A = rng.beta(1 + successes_A, 1 + trials_A - successes_A, 2000000)
+    samples_B = rng.beta(1 + successes_B, 1 + trials_B - successes_B, 2000000)
+    exact = np.percentile((samples_B - samples_A) / samples_A * 100, [2.5, 97.5])
+    # On the log-ratio scale the sketch is as close as the Monte Carlo noise
+    assert np.log1p(np.asarray(result['uplift_ci']) / 100) == pytest.approx(np.log1p(exact / 100), abs=0.02)
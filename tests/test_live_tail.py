@@ -0,0 +1,21 @@
+import pandas as pd
+
+from live_tail import EventLogTailer
+
+
+def test_tailer_reads_boolean_outcomes_written_by_pandas(tmp_path):
+    path = tmp_path / 'events.csv'
+    pd.DataFrame({
+        'group': ['A', 'A', 'B', 'B', 'B'],
+        'converted': [True, False, True, True, False]
+    }).to_csv(path, index=False)
+    with open(path, 'a') as log:
+        log.write('A,true\nB,FALSE\nA,1\nB,0\nA,maybe\n')
+
+    update = EventLogTailer(str(path)).poll()
+
+    assert update['batch'] == {
+        'A': {'kind': 'binomial', 'successes': 3, 'trials': 4},
+        'B': {'kind': 'binomial', 'successes': 2, 'trials': 5}
+    }
+    assert update['skipped'] == 1
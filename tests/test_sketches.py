@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from bayesian_models import BayesianABTest
+from sketches import HistogramSketch
+
+SMALL_COUNTS = [(0, 10, 1, 10), (0, 5, 0, 5), (0, 0, 0, 0), (0, 200, 1, 200), (5, 5, 0, 5), (100, 1000, 120, 1000)]
+
+
+def relative_uplift_draws(successes_A, trials_A, successes_B, trials_B, n_samples=400000):
+    rng = np.random.default_rng(1)
+    samples_A = rng.beta(1 + successes_A, 1 + trials_A - successes_A, n_samples)
+    samples_B = rng.beta(1 + successes_B, 1 + trials_B - successes_B, n_samples)
+    return (samples_B - samples_A) / samples_A * 100
+
+
+@pytest.mark.parametrize('counts', SMALL_COUNTS)
+def test_log_ratio_sketch_matches_percentiles_of_the_same_draws(counts):
+    draws = relative_uplift_draws(*counts)
+    sketch = HistogramSketch(scale='log_ratio')
+    for chunk in np.array_split(draws, 4):
+        sketch.update(chunk)
+    levels = [0.5, 2.5, 50, 97.5, 99.5]
+    # Compared on the log-ratio scale the sketch bins on
+    np.testing.assert_allclose(np.log1p(sketch.percentile(levels) / 100),
+                               np.log1p(np.percentile(draws, levels) / 100), atol=1e-3)
+    assert sketch.probability_greater(0) == pytest.approx(np.mean(draws > 0), abs=1e-3)
+    assert sketch.mean == pytest.approx(draws.mean())
+
+
+@pytest.mark.parametrize('counts', SMALL_COUNTS)
+def test_chunked_uplift_ci_matches_exact_quantiles(counts):
+    test = BayesianABTest(rng=1)
+    test.update_posterior(counts[0], counts[1], 'A')
+    test.update_posterior(counts[2], counts[3], 'B')
+    chunked = test.calculate_risk(400000, chunk_size=65536)['uplift_ci']
+    exact = BayesianABTest.batch_relative_uplift(
+        *BayesianABTest._posterior_arrays(*counts, 1, 1)
+    )['credible_interval_relative']
+    assert chunked[0] > -100
+    # Monte Carlo error of a 2.5% quantile from 400k draws is well under 2% of the ratio
+    np.testing.assert_allclose(np.log1p(chunked / 100), np.log1p(exact / 100), atol=0.02)
+
+
+def test_quantiles_stay_within_observed_range():
+    sketch = HistogramSketch().update(np.array([1.0, 2.0, 3.0, 1000.0]))
+    quantiles = sketch.quantile([0, 0.5, 1])
+    assert quantiles[0] >= 1.0 and quantiles[-1] <= 1000.0
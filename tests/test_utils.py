@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from bayesian_models import BayesianABTest
+from utils import simulate_stopping_rule
+
+
+def brute_force_decisions(baseline_rate, treatment_rate, batch_size, n_batches, n_reps, rule, seed,
+                          threshold=0.95, loss_threshold=0.001):
+    # Same draws as simulate_stopping_rule, with _quadrature on every look
+    rng = np.random.default_rng(seed)
+    trials = batch_size * np.arange(1, n_batches + 1)
+    successes_A = np.cumsum(rng.binomial(batch_size, baseline_rate, size=(n_reps, n_batches)), axis=1)
+    successes_B = np.cumsum(rng.binomial(batch_size, treatment_rate, size=(n_reps, n_batches)), axis=1)
+    prob_B, loss_choose_B = BayesianABTest._quadrature(
+        1.0 + successes_A, 1.0 + trials - successes_A, 1.0 + successes_B, 1.0 + trials - successes_B
+    )
+    mean_diff = (successes_B - successes_A) / (trials + 2.0)
+    if rule == 'probability':
+        choose_B = prob_B >= threshold
+        choose_A = (prob_B <= 1 - threshold) & ~choose_B
+    else:
+        choose_B = (loss_choose_B <= loss_threshold) & (mean_diff >= 0)
+        choose_A = (loss_choose_B + mean_diff <= loss_threshold) & ~choose_B
+    stop = choose_A | choose_B
+    stop_index = np.where(stop.any(axis=1), stop.argmax(axis=1), n_batches - 1)
+    rows = np.arange(n_reps)
+    decision = np.where(choose_B[rows, stop_index], 'B', np.where(choose_A[rows, stop_index], 'A', 'none'))
+    return {choice: float(np.mean(decision == choice)) for choice in ('A', 'B', 'none')}
+
+
+@pytest.mark.parametrize('rule', ['probability', 'loss'])
+@pytest.mark.parametrize('rates', [(0.1, 0.1), (0.05, 0.08), (0.02, 0.02), (0.08, 0.05)])
+def test_stopping_rule_matches_exact_posterior_at_every_look(rule, rates):
+    result = simulate_stopping_rule(*rates, batch_size=50, n_batches=10, n_reps=300, rule=rule, seed=3)
+    expected = brute_force_decisions(*rates, batch_size=50, n_batches=10, n_reps=300, rule=rule, seed=3)
+    assert result['decision_rates'] == pytest.approx(expected)
+
+
+def test_stopping_rule_small_count_probability_is_exact():
+    # 0 vs 3 of 50 is P(B > A) = 0.941 (the normal approximation gives 0.919),
+    # and 0 vs 2 of 50 stays below 0.94
+    assert BayesianABTest._quadrature(1.0, 51.0, 4.0, 48.0)[0] == pytest.approx(0.941, abs=1e-3)
+    assert BayesianABTest._quadrature(1.0, 51.0, 3.0, 49.0)[0] < 0.94
+    result = simulate_stopping_rule(0.0, 0.06, batch_size=50, n_batches=1, n_reps=2000, threshold=0.94)
+    rng = np.random.default_rng(0)
+    rng.binomial(50, 0.0, size=(2000, 1))
+    successes_B = rng.binomial(50, 0.06, size=(2000, 1))
+    assert result['decision_rates']['B'] == pytest.approx(np.mean(successes_B >= 3))
+
+
+def test_stopping_rule_loss_rule_has_no_aa_error_rate():
+    result = simulate_stopping_rule(0.1, 0.1, batch_size=50, n_batches=10, n_reps=200, rule='loss')
+    assert np.isnan(result['error_rate'])
+    assert np.isnan(result['fixed_horizon_error_rate'])
+    assert np.isnan(result['peeking_inflation'])
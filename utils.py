@@ -1,19 +1,80 @@
 import numpy as np
-import pandas as pd
-from scipy import stats
+
+import instrumentation
+from bayesian_models import BayesianABTest, FrequentistABTest, SequentialBayesianTest
+
+class RandomStreams:
+    # Independent, reproducible Generators derived with SeedSequence.spawn.
+    # Hand one stream to each worker, thread or session instead of seeding
+    # the global np.random state.
+    def __init__(self, seed=None):
+        self.seed_sequence = np.random.SeedSequence(seed)
+    
+    @property
+    def entropy(self):
+        # Log this to reproduce a run that was started without a seed
+        return self.seed_sequence.entropy
+    
+    def spawn_seeds(self, n):
+        # SeedSequences are cheap to pickle, so pass these to process pools
+        return self.seed_sequence.spawn(n)
+    
+    def spawn(self, n):
+        return [np.random.default_rng(seed) for seed in self.spawn_seeds(n)]
+    
+    def generator(self):
+        return self.spawn(1)[0]
 
 def generate_simulated_data(conversion_rate_A, conversion_rate_B, 
-                           sample_size_A, sample_size_B, seed=42):
-    np.random.seed(seed)
+                           sample_size_A, sample_size_B, seed=42, rng=None):
+    rng = np.random.default_rng(seed) if rng is None else rng
     
-    successes_A = np.random.binomial(sample_size_A, conversion_rate_A)
-    successes_B = np.random.binomial(sample_size_B, conversion_rate_B)
+    successes_A = rng.binomial(sample_size_A, conversion_rate_A)
+    successes_B = rng.binomial(sample_size_B, conversion_rate_B)
     
     return {
         'A': {'successes': successes_A, 'trials': sample_size_A},
         'B': {'successes': successes_B, 'trials': sample_size_B}
     }
 
+def split_into_batches(successes, trials, n_batches, rng=None):
+    # Splits observed totals into n_batches near-equal batches (sizes differ by
+    # at most one) and deals the successes out without replacement, i.e. one
+    # multivariate hypergeometric draw over the batches instead of a draw per batch
+    rng = np.random.default_rng(rng)
+    n_batches = min(int(n_batches), int(trials)) or 1
+    batch_trials = np.full(n_batches, int(trials) // n_batches, dtype=np.int64)
+    batch_trials[:int(trials) % n_batches] += 1
+    batch_successes = rng.multivariate_hypergeometric(batch_trials, int(successes))
+    return batch_successes, batch_trials
+
+@instrumentation.timed('utils.replay_sequential')
+def replay_sequential(data, n_batches, alpha_prior=1.0, beta_prior=1.0, rng=None, progress=None, **kwargs):
+    # data as returned by generate_simulated_data; kwargs go to
+    # SequentialBayesianTest (half_life, max_history, window)
+    rng = np.random.default_rng(rng)
+    seq_test = SequentialBayesianTest(alpha_prior=alpha_prior, beta_prior=beta_prior, rng=rng, **kwargs)
+    # One batch count for both groups (no more batches than the smaller group
+    # has trials), so every look has a batch from each
+    n_batches = min(int(n_batches), int(data['A']['trials']), int(data['B']['trials'])) or 1
+    for i, group in enumerate(['A', 'B']):
+        batch_successes, batch_trials = split_into_batches(
+            data[group]['successes'], data[group]['trials'], n_batches, rng
+        )
+        seq_test.add_observations(group, batch_successes, batch_trials)
+        if progress is not None:
+            progress((i + 1) / 2)
+    return seq_test
+
+def prior_grid(prior_means, prior_strengths):
+    # Beta priors as (mean, strength) pairs, strength = alpha + beta being the
+    # prior's weight in pseudo-observations. Rows follow prior_means and
+    # columns prior_strengths.
+    prior_means = np.asarray(prior_means, dtype=float)[:, None]
+    prior_strengths = np.asarray(prior_strengths, dtype=float)[None, :]
+    return prior_means * prior_strengths, (1 - prior_means) * prior_strengths
+
+@instrumentation.timed('utils.required_sample_size')
 def calculate_required_sample_size(mde, alpha=0.05, power=0.8, baseline_rate=0.1):
     from statsmodels.stats.power import NormalIndPower
     from statsmodels.stats.proportion import proportion_effectsize
@@ -30,6 +91,225 @@ def calculate_required_sample_size(mde, alpha=0.05, power=0.8, baseline_rate=0.1
     
     return int(np.ceil(sample_size))
 
+@instrumentation.timed('utils.simulate_scenario')
+def simulate_scenario(baseline_rate, treatment_rate, sample_size, n_sims=100,
+                      probability_threshold=0.95, significance_level=0.05, seed=0, progress=None):
+    # progress: optional callback(fraction, partial) as passed by jobs.JobManager
+    bayesian_correct = 0
+    frequentist_correct = 0
+    
+    for i, rng in enumerate(RandomStreams(seed).spawn(n_sims)):
+        data = generate_simulated_data(baseline_rate, treatment_rate, sample_size, sample_size, rng=rng)
+        
+        # Bayesian
+        bayes_test = BayesianABTest(alpha_prior=1.0, beta_prior=1.0, rng=rng)
+        bayes_test.update_posterior(data['A']['successes'], data['A']['trials'], 'A')
+        bayes_test.update_posterior(data['B']['successes'], data['B']['trials'], 'B')
+        prob = bayes_test.probability_B_beats_A()
+        if (treatment_rate > baseline_rate and prob > probability_threshold) or \
+           (treatment_rate < baseline_rate and prob < 1 - probability_threshold):
+            bayesian_correct += 1
+        
+        # Frequentist
+        prop_test = FrequentistABTest().proportion_test(
+            data['A']['successes'], data['A']['trials'],
+            data['B']['successes'], data['B']['trials']
+        )
+        if treatment_rate != baseline_rate and prop_test['p_value'] < significance_level:
+            frequentist_correct += 1
+        
+        if progress is not None:
+            progress((i + 1) / n_sims, {'n_sims': i + 1, 'bayesian_correct': bayesian_correct,
+                                        'frequentist_correct': frequentist_correct})
+    
+    return {
+        'n_sims': n_sims,
+        'bayesian_correct': bayesian_correct,
+        'frequentist_correct': frequentist_correct
+    }
+
+def _first_true(predicate, high, guess):
+    # Smallest integer s in [0, high] with predicate(rows, s) true (high + 1
+    # if there is none), per row, for predicates monotone in s: gallops out
+    # from guess to bracket the switch, then bisects. predicate is only
+    # called on the rows still open.
+    rows = np.arange(len(high))
+    guess = np.clip(guess, 0, high)
+    holds = predicate(rows, guess)
+    # Invariant: predicate is false at lo (or lo = -1) and true at hi (or hi = high + 1)
+    lo = np.where(holds, -1, guess)
+    hi = np.where(holds, guess, high + 1)
+    step = np.ones_like(high)
+    galloping = np.ones(len(high), dtype=bool)
+    while True:
+        probe = np.where(holds, hi - step, lo + step)
+        galloping &= (probe > -1) & (probe < high + 1) & (hi - lo > 1)
+        if not galloping.any():
+            break
+        open_rows = rows[galloping]
+        result = predicate(open_rows, probe[open_rows])
+        moved = np.zeros(len(high), dtype=bool)
+        moved[open_rows] = result == holds[open_rows]
+        closed = galloping & ~moved
+        hi = np.where(galloping & holds & moved, probe, hi)
+        lo = np.where(galloping & ~holds & moved, probe, lo)
+        lo = np.where(closed & holds, probe, lo)
+        hi = np.where(closed & ~holds, probe, hi)
+        galloping &= moved
+        step *= 2
+    while True:
+        open_rows = rows[hi - lo > 1]
+        if not open_rows.size:
+            return hi
+        middle = (lo[open_rows] + hi[open_rows]) // 2
+        result = predicate(open_rows, middle)
+        hi[open_rows] = np.where(result, middle, hi[open_rows])
+        lo[open_rows] = np.where(result, lo[open_rows], middle)
+
+@instrumentation.timed('utils.stopping_rule')
+def simulate_stopping_rule(baseline_rate, treatment_rate, batch_size, n_batches, n_reps=10000,
+                           rule='probability', threshold=0.95, loss_threshold=0.001,
+                           alpha_prior=1.0, beta_prior=1.0, seed=0):
+    # Replays n_reps sequential experiments at once as (n_reps, n_batches)
+    # arrays and applies the stopping rule at every look, with exact Beta
+    # posteriors. At a given look and count for A, P(B > A) and both expected
+    # losses are monotone in B's count, so each decision is a threshold on it.
+    # Thresholds are solved once per distinct (look, successes_A) with
+    # _quadrature (48 nodes are within 1e-10 of the default here), starting
+    # from the normal approximation.
+    from scipy.special import ndtr
+
+    if rule not in ('probability', 'loss'):
+        raise ValueError("rule must be 'probability' or 'loss'")
+
+    rng = np.random.default_rng(seed)
+    trials = batch_size * np.arange(1, n_batches + 1)
+    successes_A = np.cumsum(rng.binomial(batch_size, baseline_rate, size=(n_reps, n_batches)), axis=1)
+    successes_B = np.cumsum(rng.binomial(batch_size, treatment_rate, size=(n_reps, n_batches)), axis=1)
+
+    keys, inverse = np.unique(np.arange(n_batches) * (trials[-1] + 1) + successes_A, return_inverse=True)
+    n = trials[keys // (trials[-1] + 1)]
+    alpha_A = alpha_prior + keys % (trials[-1] + 1)
+    beta_A = beta_prior + n - (alpha_A - alpha_prior)
+
+    def mean_difference(rows, successes):
+        return ((alpha_prior + successes) / (alpha_prior + beta_prior + n[rows])
+                - alpha_A[rows] / (alpha_A[rows] + beta_A[rows]))
+
+    def exact(rows, successes):
+        prob_B, loss_choose_B = BayesianABTest._quadrature(
+            *(np.asarray(p, dtype=float) for p in (alpha_A[rows], beta_A[rows], alpha_prior + successes,
+                                                   beta_prior + n[rows] - successes)),
+            n_nodes=48
+        )
+        return prob_B, loss_choose_B, mean_difference(rows, successes)
+
+    def approximate(rows, successes):
+        # Normal approximation to the difference of the two posteriors
+        a, b = alpha_A[rows], beta_A[rows]
+        alpha_B, beta_B = alpha_prior + successes, beta_prior + n[rows] - successes
+        mean_diff = mean_difference(rows, successes)
+        sd_diff = np.sqrt(a * b / ((a + b) ** 2 * (a + b + 1))
+                          + alpha_B * beta_B / ((alpha_B + beta_B) ** 2 * (alpha_B + beta_B + 1)))
+        z = mean_diff / sd_diff
+        density = np.exp(-0.5 * z ** 2) / np.sqrt(2 * np.pi)
+        return ndtr(z), sd_diff * density - mean_diff * ndtr(-z), mean_diff
+
+    if rule == 'probability':
+        def chooses_B(prob_B, loss_choose_B, mean_diff):
+            return prob_B >= threshold
+
+        def rules_out_A(prob_B, loss_choose_B, mean_diff):
+            return prob_B > 1 - threshold
+    else:
+        # E[loss of A] - E[loss of B] = E[B] - E[A]
+        def chooses_B(prob_B, loss_choose_B, mean_diff):
+            return (loss_choose_B <= loss_threshold) & (mean_diff >= 0)
+
+        def rules_out_A(prob_B, loss_choose_B, mean_diff):
+            return loss_choose_B + mean_diff > loss_threshold
+
+    def boundary(condition):
+        guess = _first_true(lambda rows, s: condition(*approximate(rows, s)), n, n // 2)
+        return _first_true(lambda rows, s: condition(*exact(rows, s)), n, guess)[inverse].reshape(successes_B.shape)
+
+    choose_B = successes_B >= boundary(chooses_B)
+    choose_A = (successes_B < boundary(rules_out_A)) & ~choose_B
+
+    # First look at which the rule fires, per replication
+    stopped = choose_A | choose_B
+    any_stop = stopped.any(axis=1)
+    stop_index = np.where(any_stop, stopped.argmax(axis=1), n_batches - 1)
+    rows = np.arange(n_reps)
+    decision = np.where(~any_stop, 'none', np.where(choose_B[rows, stop_index], 'B', 'A'))
+
+    if treatment_rate > baseline_rate:
+        wrong = 'A'
+    elif treatment_rate < baseline_rate:
+        wrong = 'B'
+    else:
+        wrong = None
+
+    def error_rate(decisions):
+        if wrong is None and rule == 'loss':
+            # With equal rates either choice loses nothing, so no decision is an error
+            return np.nan
+        if wrong is None:
+            return float(np.mean(decisions != 'none'))
+        return float(np.mean(decisions == wrong))
+
+    # The same rule applied once, at the final look only
+    final_decision = np.where(choose_B[:, -1], 'B', np.where(choose_A[:, -1], 'A', 'none'))
+    peeking_error = error_rate(decision)
+    fixed_error = error_rate(final_decision)
+
+    decided_at = stop_index[any_stop] + 1
+    return {
+        'n_reps': n_reps,
+        'n_batches': n_batches,
+        'batch_size': batch_size,
+        'rule': rule,
+        'decision_rates': {choice: float(np.mean(decision == choice)) for choice in ('A', 'B', 'none')},
+        'error_rate': peeking_error,
+        'fixed_horizon_error_rate': fixed_error,
+        'peeking_inflation': peeking_error / fixed_error if fixed_error > 0 else np.nan,
+        'stop_counts': np.bincount(decided_at, minlength=n_batches + 1)[1:],
+        'mean_batches_to_decision': float(decided_at.mean()) if decided_at.size else np.nan,
+        'median_batches_to_decision': float(np.median(decided_at)) if decided_at.size else np.nan,
+        'mean_samples_per_group': float(np.mean((stop_index + 1) * batch_size))
+    }
+
+@instrumentation.timed('utils.compare_portfolio')
+def compare_portfolio(successes_A, trials_A, successes_B, trials_B, alpha_prior=1.0, beta_prior=1.0,
+                      probability_threshold=0.95, significance_level=0.05):
+    # Bayesian vs frequentist calls for many experiments at once; every
+    # input may be an array and all outputs are arrays of the same shape
+    risk = BayesianABTest.batch_calculate_risk(successes_A, trials_A, successes_B, trials_B,
+                                               alpha_prior, beta_prior)
+    chi2 = FrequentistABTest.batch_chi_squared_test(successes_A, trials_A, successes_B, trials_B)
+    z_test = FrequentistABTest.batch_proportion_test(successes_A, trials_A, successes_B, trials_B)
+    
+    prob = risk['probability_B_beats_A']
+    bayesian_call = np.where(prob > probability_threshold, 'B',
+                             np.where(prob < 1 - probability_threshold, 'A', 'none'))
+    significant = z_test['p_value'] < significance_level
+    frequentist_call = np.where(significant, np.where(z_test['difference'] > 0, 'B', 'A'), 'none')
+    
+    return {
+        'probability_B_beats_A': prob,
+        'expected_uplift': risk['expected_uplift'],
+        'uplift_ci': risk['uplift_ci'],
+        'expected_loss_choose_A': risk['expected_loss_choose_A'],
+        'expected_loss_choose_B': risk['expected_loss_choose_B'],
+        'chi2_p_value': chi2['p_value'],
+        'z_statistic': z_test['z_statistic'],
+        'z_p_value': z_test['p_value'],
+        'ci_difference': z_test['ci_difference'],
+        'bayesian_call': bayesian_call,
+        'frequentist_call': frequentist_call,
+        'agree': bayesian_call == frequentist_call
+    }
+
 def format_results_for_display(risk_metrics):
     return {
         'Probability B > A': f"{risk_metrics['probability_B_beats_A']:.3f}",
@@ -41,6 +321,7 @@ def format_results_for_display(risk_metrics):
         'Recommended Choice': risk_metrics['recommended_choice']
     }
 
+@instrumentation.timed('utils.bayes_factor')
 def calculate_bayes_factor(bayesian_test, n_samples=100000):
     samples_A = bayesian_test.get_posterior_samples('A', n_samples)
     samples_B = bayesian_test.get_posterior_samples('B', n_samples)
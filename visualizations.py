@@ -2,8 +2,10 @@ import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 import numpy as np
-import pandas as pd
 
+import instrumentation
+
+@instrumentation.timed('plot.posterior_distributions')
 def plot_posterior_distributions(bayesian_test, n_samples=100000):
     samples_A = bayesian_test.get_posterior_samples('A', n_samples)
     samples_B = bayesian_test.get_posterior_samples('B', n_samples)
@@ -52,30 +54,35 @@ def plot_posterior_distributions(bayesian_test, n_samples=100000):
     
     return fig
 
-def plot_uplift_distribution(bayesian_test, n_samples=100000):
-    uplift_stats = bayesian_test.uplift_distribution(n_samples)
+def _histogram_bar(histogram, name, color):
+    # Draws a precomputed histogram (see HistogramSketch.to_summary) as bars
+    edges = np.asarray(histogram['edges'])
+    return go.Bar(x=(edges[:-1] + edges[1:]) / 2,
+                  y=histogram['counts'],
+                  width=np.diff(edges),
+                  name=name,
+                  marker_color=color)
+
+@instrumentation.timed('plot.uplift_distribution')
+def plot_uplift_distribution(bayesian_test, n_samples=100000, uplift_stats=None):
+    if uplift_stats is None:
+        uplift_stats = bayesian_test.uplift_distribution(n_samples, summary_only=True)
     
     fig = make_subplots(
         rows=1, cols=2,
         subplot_titles=('Absolute Uplift Distribution', 'Relative Uplift (%)'),
-        specs=[[{"type": "histogram"}, {"type": "histogram"}]]
+        specs=[[{"type": "bar"}, {"type": "bar"}]]
     )
     
     fig.add_trace(
-        go.Histogram(x=uplift_stats['absolute_uplift'], 
-                     name='Absolute Uplift',
-                     nbinsx=50,
-                     marker_color='green'),
+        _histogram_bar(uplift_stats['absolute_histogram'], 'Absolute Uplift', 'green'),
         row=1, col=1
     )
     
     fig.add_vline(x=0, line_dash="dash", line_color="red", row=1, col=1)
     
     fig.add_trace(
-        go.Histogram(x=uplift_stats['relative_uplift'], 
-                     name='Relative Uplift (%)',
-                     nbinsx=50,
-                     marker_color='orange'),
+        _histogram_bar(uplift_stats['relative_histogram'], 'Relative Uplift (%)', 'orange'),
         row=1, col=2
     )
     
@@ -87,6 +94,7 @@ def plot_uplift_distribution(bayesian_test, n_samples=100000):
     fig.update_layout(
         height=400,
         showlegend=False,
+        bargap=0,
         title_text="Uplift Analysis"
     )
     
@@ -97,13 +105,61 @@ def plot_uplift_distribution(bayesian_test, n_samples=100000):
     
     return fig
 
-def plot_sequential_history(sequential_test):
+SENSITIVITY_METRICS = {
+    'probability_B_beats_A': ('P(B > A)', '.1%'),
+    'expected_loss_choose_B': ('Expected loss of choosing B', '.5f'),
+    'expected_uplift': ('Expected relative uplift (%)', '.2f')
+}
+
+@instrumentation.timed('plot.prior_sensitivity')
+def plot_prior_sensitivity(sensitivity, metric='probability_B_beats_A', current_prior=None):
+    # sensitivity from prior_sensitivity() over a utils.prior_grid grid:
+    # prior mean down the rows, prior strength (alpha + beta) across the columns
+    title, value_format = SENSITIVITY_METRICS[metric]
+    strength = sensitivity['alpha_prior'] + sensitivity['beta_prior']
+    prior_means = (sensitivity['alpha_prior'] / strength)[:, 0]
+    prior_strengths = strength[0]
+    
+    fig = go.Figure(go.Heatmap(
+        x=prior_strengths,
+        y=prior_means,
+        z=sensitivity[metric],
+        colorscale='Greys',
+        colorbar=dict(title=title, tickformat=value_format),
+        hovertemplate=(f"prior mean = %{{y:.2%}}<br>strength = %{{x:.3g}}<br>"
+                       f"{title} = %{{z:{value_format}}}<extra></extra>")
+    ))
+    
+    if current_prior is not None:
+        alpha, beta = current_prior
+        fig.add_trace(go.Scatter(
+            x=[alpha + beta],
+            y=[alpha / (alpha + beta)],
+            mode='markers',
+            marker=dict(symbol='x', size=12, color='red'),
+            name='Current prior'
+        ))
+    
+    fig.update_layout(
+        title=f'Prior Sensitivity: {title}',
+        xaxis=dict(title='Prior strength (pseudo-observations)', type='log'),
+        yaxis=dict(title='Prior mean', tickformat='.1%'),
+        height=450,
+        showlegend=False
+    )
+    
+    return fig
+
+@instrumentation.timed('plot.sequential_history')
+def plot_sequential_history(sequential_test, max_points=None):
     df = sequential_test.get_history_df()
     
     fig = go.Figure()
     
     for group in ['A', 'B']:
         group_df = df[df['group'] == group]
+        if max_points and len(group_df) > max_points:
+            group_df = group_df.iloc[np.unique(np.linspace(len(group_df) - 1, 0, max_points).round().astype(int))]
         fig.add_trace(go.Scatter(
             x=group_df['cumulative_trials'],
             y=group_df['posterior_mean'],